@@ -1,3 +1,14 @@
+from utils.bm25 import certificate_retriever
+from utils.field_index import get_field_index
+from utils.intents import has_intent
+from utils.mapping_config import get_mapping_index
+from utils.text_index import text_contains
+
+# Text retrieval for questions outside the known topics
+RETRIEVAL_TOP_K = 3
+MIN_RETRIEVAL_SCORE = 1.5
+
+
 def answer_from_state(state):
     """
     Answer user questions directly from existing state without re-extracting.
@@ -11,10 +22,7 @@ def answer_from_state(state):
     auto_extracted = False
 
     # Handle existence/counting questions FIRST
-    is_there_question = any(
-        phrase in user_message
-        for phrase in ["is there", "are there", "any other", "another", "multiple"]
-    )
+    is_there_question = has_intent(user_message, "is_there")
 
     if is_there_question and extracted_fields:
         # User is asking if there are multiple items or other items
@@ -52,6 +60,48 @@ def answer_from_state(state):
         )
         return state
 
+    # Detect what information user is asking for - first topic in config order
+    found_topic = get_mapping_index().topic_of(user_message)
+
+    # Questions outside the known topics: look the answer up in the
+    # certificate text before extracting anything. Requests for a summary
+    # go to the field overview instead.
+    if (
+        found_topic is None
+        and not has_intent(user_message, "overview")
+        and state["certificate"].raw_text.strip()
+    ):
+        retriever = certificate_retriever(state["certificate"].raw_text)
+        hits = retriever.search(
+            user_message, k=RETRIEVAL_TOP_K, min_score=MIN_RETRIEVAL_SCORE
+        )
+        if hits:
+            response = "🔎 **From the certificate text:**\n"
+            for score, line, section in hits:
+                context = (
+                    f" _({section})_" if section and line.rstrip(":") != section else ""
+                )
+                response += (
+                    f"  - {line.lstrip('-•* ')}{context} — relevance {score:.1f}\n"
+                )
+                # A matching heading answers with the whole section
+                if section and line.rstrip(":") == section:
+                    for section_line in retriever.section_lines(section)[1:]:
+                        response += f"      {section_line}\n"
+            response += (
+                "\n✓ *Answered from the certificate text (no extraction needed)*"
+            )
+
+            state["conversation"].last_agent_message = response
+            state["conversation"].conversation_history.append(
+                {
+                    "user": state["conversation"].last_user_message,
+                    "agent": state["conversation"].last_agent_message,
+                    "action": "answer_from_state",
+                }
+            )
+            return state
+
     if not extracted_fields:
         # Import here to avoid circular dependency
         from actions.extract import extract_information
@@ -91,84 +141,46 @@ def answer_from_state(state):
             + "\n\n---\n\n"
         )
 
-    # Continue with normal flow
-    confidence = state["certificate"].confidence
+    # Continue with normal flow - lookups come from the precomputed field index
+    index = get_field_index(state["certificate"])
+    confidence = index.confidence
     criteria = state["evaluation"].criteria
     scores = state["evaluation"].scores
     final_score = state["evaluation"].final_score
 
     response = ""
 
-    # Detect what information user is asking for
-    asking_about = {
-        "name": ["name", "student name", "whose certificate", "who is"],
-        "gpa": ["gpa", "grade point", "grades", "cumulative gpa", "major gpa"],
-        "degree": ["degree", "what degree", "major", "field of study"],
-        "university": [
-            "university",
-            "institution",
-            "school",
-            "college",
-            "where did",
-        ],
-        "graduation": [
-            "graduation",
-            "graduated",
-            "conferred",
-            "completion date",
-            "when did",
-        ],
-        "score": [
-            "what score",
-            "current score",
-            "total score",
-            "final score",
-            "rating",
-        ],
-        "criteria": ["what criteria", "evaluation criteria", "what factors"],
-        "honors": ["honors", "awards", "distinctions", "achievements"],
-        "research": ["research", "publications", "papers", "lab"],
-        "leadership": ["leadership", "president", "vice president", "officer"],
-    }
-
-    # Find what user is asking about
-    found_topic = None
-    for topic, keywords in asking_about.items():
-        if any(keyword in user_message for keyword in keywords):
-            found_topic = topic
-            break
-
     # Answer based on what they're asking
-    if found_topic == "name" and "Name" in extracted_fields:
-        name = extracted_fields["Name"]
-        conf = confidence.get("Name", 0.0) * 100
+    name_field = index.field("name")
+    degree_field = index.field("degree")
+    if found_topic == "name" and name_field:
+        name = extracted_fields[name_field]
+        conf = confidence.get(name_field, 0.0) * 100
         response = f"📝 The student's name is **{name}** (confidence: {conf:.1f}%)\n\n"
 
     elif found_topic == "gpa":
-        gpa_fields = {k: v for k, v in extracted_fields.items() if "gpa" in k.lower()}
+        gpa_fields = index.topic_fields("gpa")
         if gpa_fields:
             response = "📊 **GPA Information:**\n"
-            for field, value in gpa_fields.items():
+            for field in gpa_fields:
+                value = extracted_fields[field]
                 conf = confidence.get(field, 0.0) * 100
                 response += f"  - {field}: {value} (confidence: {conf:.1f}%)\n"
             response += "\n"
         else:
             response = "⚠️ No GPA information found in extracted data.\n\n"
 
-    elif found_topic == "degree" and "Degree" in extracted_fields:
-        degree = extracted_fields["Degree"]
-        conf = confidence.get("Degree", 0.0) * 100
+    elif found_topic == "degree" and degree_field:
+        degree = extracted_fields[degree_field]
+        conf = confidence.get(degree_field, 0.0) * 100
         response = f"🎓 The degree is **{degree}** (confidence: {conf:.1f}%)\n\n"
 
     elif found_topic == "university":
-        uni_fields = {
-            k: v
-            for k, v in extracted_fields.items()
-            if "university" in k.lower() or "college" in k.lower()
-        }
+        uni_fields = index.topic_fields("university")
         if uni_fields:
             response = "🏛️ **Institution Information:**\n"
-            for field, value in uni_fields.items():
+            for field in uni_fields:
+                value = extracted_fields[field]
                 conf = confidence.get(field, 0.0) * 100
                 response += f"  - {field}: {value} (confidence: {conf:.1f}%)\n"
             response += "\n"
@@ -176,14 +188,11 @@ def answer_from_state(state):
             response = "⚠️ No university information found in extracted data.\n\n"
 
     elif found_topic == "graduation":
-        grad_fields = {
-            k: v
-            for k, v in extracted_fields.items()
-            if "conferred" in k.lower() or "graduation" in k.lower()
-        }
+        grad_fields = index.topic_fields("graduation")
         if grad_fields:
             response = "📅 **Graduation Information:**\n"
-            for field, value in grad_fields.items():
+            for field in grad_fields:
+                value = extracted_fields[field]
                 conf = confidence.get(field, 0.0) * 100
                 response += f"  - {field}: {value} (confidence: {conf:.1f}%)\n"
             response += "\n"
@@ -216,20 +225,17 @@ def answer_from_state(state):
 
     elif found_topic in ["honors", "research", "leadership"]:
         # Search in all extracted fields for this topic
-        relevant_fields = {
-            k: v
-            for k, v in extracted_fields.items()
-            if found_topic in k.lower() or found_topic in str(v).lower()
-        }
+        relevant_fields = index.topic_fields(found_topic)
         if relevant_fields:
             response = f"🏆 **{found_topic.title()} Information:**\n"
-            for field, value in relevant_fields.items():
+            for field in relevant_fields:
+                value = extracted_fields[field]
                 conf = confidence.get(field, 0.0) * 100
                 response += f"  - {field}: {value} (confidence: {conf:.1f}%)\n"
             response += "\n"
         else:
             # Check raw certificate text
-            if found_topic in state["certificate"].raw_text.lower():
+            if text_contains(state["certificate"].raw_text, found_topic):
                 response = (
                     f"ℹ️ {found_topic.title()} information exists in the certificate "
                     f"but hasn't been extracted yet.\n"
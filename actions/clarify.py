@@ -1,3 +1,7 @@
+from utils.field_index import get_field_index
+from utils.intents import has_intent
+
+
 def ask_clarification(state):
     """
     Ask for clarification when information is unclear or missing.
@@ -5,10 +9,7 @@ def ask_clarification(state):
     """
     # Check if this is about missing criteria for scoring
     user_message = state["conversation"].last_user_message.lower()
-    wants_score = any(
-        word in user_message
-        for word in ["score", "calculate", "rate", "evaluate", "scoring"]
-    )
+    wants_score = has_intent(user_message, "wants_score")
 
     if wants_score and not state["evaluation"].criteria:
         # User wants to score but no criteria set
@@ -33,21 +34,11 @@ def ask_clarification(state):
         if state["conversation"].uncertainty:
             msg += f"\nUncertainty detected: {state['conversation'].uncertainty}\n"
 
-        # Check for low confidence fields - safely handle confidence values
-        low_confidence_fields = []
-        if state["certificate"].confidence:
-            for k, v in state["certificate"].confidence.items():
-                try:
-                    # Ensure v is a float
-                    if isinstance(v, (int, float)):
-                        conf_value = float(v)
-                        if conf_value < 0.7:
-                            low_confidence_fields.append(
-                                f"{k} ({conf_value * 100:.1f}% confidence)"
-                            )
-                except (ValueError, TypeError):
-                    # Skip if we can't convert to float
-                    continue
+        # Low confidence fields, precomputed when the extraction was indexed
+        low_confidence_fields = [
+            f"{k} ({conf_value * 100:.1f}% confidence)"
+            for k, conf_value in get_field_index(state["certificate"]).low_confidence
+        ]
 
         if low_confidence_fields:
             msg += "\nFields with low confidence:\n"
@@ -1,36 +1,178 @@
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+
+from actions.score import score_batch
+from state.certificate_state import CertificateState
+from utils.leaderboard import Leaderboard
+
+# Directory scanned for other certificates when the user doesn't name files
+CORPUS_DIR = Path("data/corpus")
+
+CURRENT_LABEL = "current certificate"
+
+# Certificates listed in a comparison, best first
+COMPARE_TOP_K = 10
+
+
+def load_certificate_file(path):
+    """
+    Load one certificate from disk.
+
+    Supports plain certificate text (.txt), saved session files and
+    JSON files holding raw_text / extracted_fields / confidence.
+    """
+    path = Path(path)
+    if path.suffix.lower() != ".json":
+        return CertificateState(raw_text=path.read_text())
+
+    with open(path, "r") as f:
+        data = json.load(f)
+
+    # Saved session files nest the certificate under "certificate"
+    data = data.get("certificate", data)
+    return CertificateState(
+        raw_text=data.get("raw_text", ""),
+        extracted_fields=data.get("extracted_fields", {}),
+        confidence=data.get("confidence", {}),
+    )
+
+
+def load_certificates(paths=None, corpus_dir=CORPUS_DIR):
+    """
+    Load certificates from explicit file paths or from a corpus directory.
+
+    Returns:
+        List of (label, CertificateState) tuples, skipping unreadable files
+    """
+    if paths is None:
+        corpus_dir = Path(corpus_dir)
+        if not corpus_dir.is_dir():
+            return []
+        paths = sorted(
+            p for p in corpus_dir.iterdir() if p.suffix.lower() in (".txt", ".json")
+        )
+
+    certificates = []
+    for path in paths:
+        try:
+            certificates.append((Path(path).stem, load_certificate_file(path)))
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠️ Skipping certificate {path}: {e}")
+    return certificates
+
+
+def rank_certificates(certificates, criteria, k=COMPARE_TOP_K):
+    """
+    Stream (label, CertificateState) pairs through the batch scorer,
+    keeping only the best k in a Leaderboard.
+
+    Returns:
+        (top k LeaderboardEntry list, final scores (n,) in input order)
+    """
+    leaderboard = Leaderboard(k=k)
+    totals = np.fromiter(
+        (
+            final_score
+            for _, _, final_score in score_batch(certificates, criteria, leaderboard)
+        ),
+        dtype=float,
+        count=len(certificates),
+    )
+    return leaderboard.top(), totals
+
+
+def _paths_from_message(message, corpus_dir=CORPUS_DIR):
+    """
+    Certificate files named in the user's message. Only files inside the
+    corpus directory are accepted, named by path or by file name alone, so
+    a message can't read other files on the server (e.g. saved sessions).
+    """
+    corpus = Path(corpus_dir).resolve()
+    paths = []
+    for candidate in re.findall(r"[\w./\\-]+\.(?:txt|json)", message):
+        for path in (Path(candidate).resolve(), (corpus / candidate).resolve()):
+            if corpus in path.parents and path.is_file() and path not in paths:
+                paths.append(path)
+                break
+    return paths
+
+
 def compare_certificates(state):
     """
-    Compare certificates. Handles single certificate mode with comparison intent.
-    In a full multi-certificate system, this would compare multiple loaded certificates.
+    Compare the current certificate against other loaded certificates.
+    Others come from files named in the message or from the corpus directory.
     """
-    # Check if user provided comparison data in message
-    user_message = state["conversation"].last_user_message.lower()
-    
-    if "with" in user_message or "vs" in user_message or "versus" in user_message:
-        # User is trying to compare with something
+    user_message = state["conversation"].last_user_message
+    named_paths = _paths_from_message(user_message)
+    others = load_certificates(named_paths or None)
+    criteria = state["evaluation"].criteria
+
+    if not others:
         state["conversation"].last_agent_message = (
             "📊 Certificate comparison requested.\n\n"
-            "I detected a comparison request, but this system is currently configured "
-            "for single-certificate evaluation.\n\n"
+            "I couldn't find any other certificates to compare against.\n\n"
             "To enable multi-certificate comparison:\n"
-            "  1. Load additional certificate data into the system\n"
-            "  2. Define comparison criteria (e.g., GPA ranges, institution tiers)\n"
-            "  3. Specify what aspects to compare (academic performance, honors, etc.)\n\n"
+            f"  1. Add certificate files (.txt or .json) to `{CORPUS_DIR}`\n"
+            "     or name the files in your message\n"
+            "  2. Define comparison criteria (e.g., GPA, Research, Leadership)\n"
+            "  3. Ask me to compare again\n\n"
             "For this certificate, I can provide detailed evaluation against "
             "standard benchmarks or custom criteria you specify."
         )
-    else:
-        # General comparison inquiry
+    elif not criteria:
         state["conversation"].last_agent_message = (
-            "📊 Certificate comparison capabilities:\n\n"
-            "Current system: Single certificate evaluation mode\n\n"
-            "Available comparison features:\n"
-            "  • Evaluate against standard academic benchmarks\n"
-            "  • Compare to industry averages\n"
-            "  • Assess competitiveness for graduate programs\n"
-            "  • Benchmark against peer institutions\n\n"
-            "What specific comparison would you like me to perform?"
+            f"📊 Found {len(others)} certificate(s) to compare against.\n\n"
+            "⚠️ No evaluation criteria set yet - I need criteria to rank them.\n"
+            "For example: 'Set criteria to GPA 40%, Research 30%, Leadership 30%'"
+        )
+    else:
+        labelled = [(CURRENT_LABEL, state["certificate"])] + others
+        leaders, totals = rank_certificates(labelled, criteria)
+
+        # The current certificate arrived first, so it wins exact ties
+        n = len(totals)
+        sorted_totals = np.sort(totals)
+
+        def percentile(total):
+            if n == 1:
+                return 100.0
+            return np.searchsorted(sorted_totals, total, side="left") / (n - 1) * 100
+
+        current = totals[0]
+        current_rank = int((totals > current).sum()) + 1
+
+        lines = []
+        for entry in leaders:
+            marker = " 👈" if entry.label == CURRENT_LABEL else ""
+            lines.append(
+                f"  {entry.rank}. {entry.label}: {entry.final_score:.1f}/100 "
+                f"({percentile(entry.final_score):.0f}th percentile){marker}"
+            )
+        if n > len(leaders):
+            lines.append(f"  ... and {n - len(leaders)} more")
+
+        response = (
+            f"📊 **Certificate Comparison ({n} certificates)**\n\n"
+            f"Criteria: {', '.join(f'{k} ({v:.2f})' for k, v in criteria.items())}\n\n"
+            + "\n".join(lines)
+            + "\n\n"
+            f"**Your certificate:** rank {current_rank} of {n}, "
+            f"{percentile(current):.0f}th percentile\n"
         )
+        if leaders[0].label != CURRENT_LABEL:
+            response += (
+                f"  - Behind the leader ({leaders[0].label}) by "
+                f"{leaders[0].final_score - current:.1f} points\n"
+            )
+        elif len(leaders) > 1:
+            response += (
+                f"  - Ahead of the runner-up ({leaders[1].label}) by "
+                f"{current - leaders[1].final_score:.1f} points\n"
+            )
+        state["conversation"].last_agent_message = response
 
     # Update conversation history
     state["conversation"].conversation_history.append(
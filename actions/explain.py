@@ -1,3 +1,6 @@
+from utils.intents import tag_message
+
+
 def explain_decision(state):
     """
     Explain the last decision made by the agent, including reasoning and uncertainty.
@@ -6,66 +9,15 @@ def explain_decision(state):
     """
     user_message = state["conversation"].last_user_message.lower().strip()
 
-    # Detect greetings
-    greetings = [
-        "hello",
-        "hi",
-        "hey",
-        "good morning",
-        "good afternoon",
-        "good evening",
-        "greetings",
-        "howdy",
-    ]
-    is_greeting = any(greeting in user_message for greeting in greetings)
-
-    # Detect farewells
-    farewells = [
-        "bye",
-        "goodbye",
-        "see you",
-        "farewell",
-        "take care",
-        "later",
-        "gotta go",
-        "have to go",
-    ]
-    is_farewell = any(farewell in user_message for farewell in farewells)
-
-    # Detect gratitude/acknowledgment
-    gratitude = [
-        "thank you",
-        "thanks",
-        "appreciate",
-        "got it",
-        "understood",
-        "ok thanks",
-        "okay thanks",
-        "cool thanks",
-    ]
-    is_gratitude = any(thanks in user_message for thanks in gratitude)
-
-    # Detect capability queries
-    capability_queries = [
-        "what can you do",
-        "help",
-        "capabilities",
-        "what do you do",
-        "how does this work",
-    ]
-    is_capability_query = any(query in user_message for query in capability_queries)
+    # Detect greetings, farewells, gratitude and capability queries
+    intents = tag_message(user_message)
+    is_greeting = "greeting" in intents
+    is_farewell = "farewell" in intents
+    is_gratitude = "gratitude" in intents
+    is_capability_query = "capability" in intents
 
     # Detect if user is asking to explain PREVIOUS action
-    asking_about_previous = any(
-        phrase in user_message
-        for phrase in [
-            "explain your last",
-            "explain the last",
-            "why did you",
-            "explain your previous",
-            "explain that",
-        ]
-    )
+    asking_about_previous = "previous_action" in intents
 
     # If asking about previous action, explain it from history
     if asking_about_previous and len(state["conversation"].reasoning_history) >= 2:
@@ -1,7 +1,15 @@
 import json
 
 from llm.json_utils import safe_json_parse
+from actions.score import invalidate_scores
 from llm.llm_client import get_llm
+from utils.field_index import rebuild_field_index
+from utils.intents import has_intent
+from utils.minhash import (
+    find_cached_extraction,
+    find_similar_extraction,
+    remember_extraction,
+)
 
 llm = get_llm()
 
@@ -16,17 +24,7 @@ def extract_information(state):
     extracted_fields = state["certificate"].extracted_fields
 
     # Check if user explicitly wants re-extraction
-    force_reextract = any(
-        word in user_message
-        for word in [
-            "re-extract",
-            "reextract",
-            "extract again",
-            "fresh extraction",
-            "update data",
-            "refresh data",
-        ]
-    )
+    force_reextract = has_intent(user_message, "force_reextract")
 
     # If data already exists and user didn't force re-extraction
     if extracted_fields and not force_reextract:
@@ -73,6 +71,44 @@ def extract_information(state):
     else:
         extraction_notice = ""
 
+    # Reuse this session's extraction of a resubmitted certificate (same text
+    # apart from whitespace, case or punctuation) instead of calling the LLM
+    if not force_reextract:
+        cached = find_cached_extraction(
+            state["certificate"].raw_text, state["conversation"].session_id
+        )
+        if cached:
+            state["certificate"].extracted_fields = cached["fields"]
+            state["certificate"].confidence = cached.get("confidence", {})
+            invalidate_scores(state["evaluation"])
+            rebuild_field_index(state["certificate"])
+
+            extracted_summary = "\n".join(
+                [f"  - {k}: {v}" for k, v in cached["fields"].items()]
+            )
+            state["conversation"].last_agent_message = (
+                f"✓ **Extracted certificate information:**\n\n{extracted_summary}\n\n"
+                "_ℹ️ Reused the extraction of an earlier submission of this "
+                "certificate (same text apart from formatting). "
+                "Say 're-extract' to force fresh extraction._"
+            )
+            state["conversation"].last_reason = (
+                "Certificate text matches one already extracted in this session "
+                "apart from formatting. Reused that extraction instead of running "
+                "a new one."
+            )
+
+            # Update conversation history
+            state["conversation"].conversation_history.append(
+                {
+                    "user": state["conversation"].last_user_message,
+                    "agent": state["conversation"].last_agent_message,
+                    "action": "extract_information",
+                }
+            )
+
+            return state
+
     prompt = f"""
 Extract certificate details from the following text.
 Highlight uncertainty where applicable.
@@ -109,6 +145,12 @@ Example:
 
 IMPORTANT: Confidence values MUST be numbers between 0.0 and 1.0, not strings or objects.
 """
+    # Near-duplicates of earlier certificates are extracted afresh; the
+    # similarity is only reported
+    similarity = find_similar_extraction(
+        state["certificate"].raw_text, state["conversation"].session_id
+    )
+
     result = llm.invoke(prompt)
 
     # Use safe JSON parsing with fallback
@@ -134,6 +176,14 @@ IMPORTANT: Confidence values MUST be numbers between 0.0 and 1.0, not strings or
 
     state["certificate"].extracted_fields = data.get("fields", {})
     state["certificate"].confidence = data.get("confidence", {})
+    invalidate_scores(state["evaluation"])
+    rebuild_field_index(state["certificate"])
+    remember_extraction(
+        state["certificate"].raw_text,
+        state["certificate"].extracted_fields,
+        state["certificate"].confidence,
+        state["conversation"].session_id,
+    )
 
     # Set agent response message
     if state["certificate"].extracted_fields:
@@ -157,6 +207,12 @@ IMPORTANT: Confidence values MUST be numbers between 0.0 and 1.0, not strings or
         f"{extraction_notice}✓ **Extracted certificate information:**\n\n{extracted_summary}\n\n"
         f"**Confidence levels:**\n{confidence_summary}"
     )
+    if similarity is not None:
+        state["conversation"].last_agent_message += (
+            f"\n\n_ℹ️ Near-duplicate of a certificate extracted earlier in this "
+            f"session (estimated similarity {similarity * 100:.0f}%); "
+            f"extracted afresh since its details may differ._"
+        )
 
     # Update reasoning to reflect actual extraction
     if force_reextract:
@@ -1,13 +1,86 @@
+import math
+import re
+
+from utils import metrics
+
+# Exchanges per history page; the default page is the most recent one
+HISTORY_PAGE_SIZE = 10
+
+PAGE_RE = re.compile(r"\bpage\s+(\d+)", re.I)
+PAGE_SIZE_RE = re.compile(r"\b(?:last|recent)\s+(\d+)", re.I)
+
+
+def page_count(history, page_size=HISTORY_PAGE_SIZE):
+    return max(math.ceil(len(history) / page_size), 1)
+
+
+def parse_page_request(message):
+    """
+    (page, page_size) asked for in a message such as "history page 2" or
+    "show the last 25 exchanges"; page is None for the most recent page.
+    """
+    page_size = HISTORY_PAGE_SIZE
+    size_match = PAGE_SIZE_RE.search(message or "")
+    if size_match:
+        page_size = max(int(size_match.group(1)), 1)
+    page_match = PAGE_RE.search(message or "")
+    return (int(page_match.group(1)) if page_match else None), page_size
+
+
+def render_history_page(history, page=None, page_size=HISTORY_PAGE_SIZE):
+    """
+    Yield the text of one page of exchanges, piece by piece.
+
+    Pages are numbered from 1 (oldest); page=None is the most recent page.
+    Only the page's entries are read, so the cost doesn't grow with the
+    session.
+    """
+    pages = page_count(history, page_size)
+    page = pages if page is None else min(max(page, 1), pages)
+    start = (page - 1) * page_size
+    entries = history[start : start + page_size]
+
+    yield (
+        f"📜 **Conversation History ({len(history)} exchanges, "
+        f"page {page}/{pages})**\n\n"
+    )
+    yield "=" * 70 + "\n\n"
+
+    for i, exchange in enumerate(entries, start + 1):
+        user_msg = exchange.get("user", "")
+        agent_msg = exchange.get("agent", "")
+        action = exchange.get("action", "unknown")
+
+        # Truncate long messages for readability
+        user_preview = user_msg[:100] + "..." if len(user_msg) > 100 else user_msg
+        agent_preview = agent_msg[:200] + "..." if len(agent_msg) > 200 else agent_msg
+
+        yield (
+            f"**[{i}] Turn {i}**\n"
+            f"🎯 Action: `{action}`\n\n"
+            f"👤 **You:** {user_preview}\n\n"
+            f"🤖 **Agent:** {agent_preview}\n\n" + "-" * 70 + "\n\n"
+        )
+
+    if pages > 1:
+        navigation = []
+        if page > 1:
+            navigation.append(f"'history page {page - 1}' for older")
+        if page < pages:
+            navigation.append(f"'history page {page + 1}' for newer")
+        yield f"📄 Say {' or '.join(navigation)} exchanges.\n"
+
+
 def show_history(state):
     """
-    Display the full conversation history with detailed information.
-    Shows all exchanges, actions taken, and reasoning trail.
+    Display one page of conversation history with detailed information.
+    Shows the page's exchanges, actions taken, and reasoning trail.
     """
     conversation_history = state["conversation"].conversation_history
     reasoning_history = state["conversation"].reasoning_history
 
     if not conversation_history:
-        state["conversation"].last_agent_message = (
+        response = (
             "📜 **Conversation History**\n\n"
             "No conversation history yet. This is our first interaction!\n\n"
             "Start by saying:\n"
@@ -16,28 +89,8 @@ def show_history(state):
             "• 'Score my certificate'\n"
         )
     else:
-        # Build detailed history response
-        response = (
-            f"📜 **Conversation History ({len(conversation_history)} exchanges)**\n\n"
-        )
-        response += "=" * 70 + "\n\n"
-
-        for i, exchange in enumerate(conversation_history, 1):
-            user_msg = exchange.get("user", "")
-            agent_msg = exchange.get("agent", "")
-            action = exchange.get("action", "unknown")
-
-            # Truncate long messages for readability
-            user_preview = user_msg[:100] + "..." if len(user_msg) > 100 else user_msg
-            agent_preview = (
-                agent_msg[:200] + "..." if len(agent_msg) > 200 else agent_msg
-            )
-
-            response += f"**[{i}] Turn {i}**\n"
-            response += f"🎯 Action: `{action}`\n\n"
-            response += f"👤 **You:** {user_preview}\n\n"
-            response += f"🤖 **Agent:** {agent_preview}\n\n"
-            response += "-" * 70 + "\n\n"
+        page, page_size = parse_page_request(state["conversation"].last_user_message)
+        response = "".join(render_history_page(conversation_history, page, page_size))
 
         # Add reasoning summary
         if reasoning_history:
@@ -51,12 +104,20 @@ def show_history(state):
         response += "\n\n📊 **Session Statistics:**\n"
         response += f"  - Total Exchanges: {len(conversation_history)}\n"
         response += f"  - Reasoning Steps: {len(reasoning_history)}\n"
+        decisions = sorted(
+            reasoning_history.counts().items(), key=lambda x: x[1], reverse=True
+        )
+        if decisions:
+            response += (
+                "  - Top Decisions: "
+                + ", ".join(
+                    f"{decision} ({count})" for decision, count in decisions[:3]
+                )
+                + "\n"
+            )
 
-        # Count actions
-        actions_count = {}
-        for exchange in conversation_history:
-            action = exchange.get("action", "unknown")
-            actions_count[action] = actions_count.get(action, 0) + 1
+        # Running counts kept by the history itself
+        actions_count = conversation_history.counts()
 
         response += f"  - Actions Taken:\n"
         for action, count in sorted(
@@ -64,6 +125,38 @@ def show_history(state):
         ):
             response += f"    • {action}: {count}x\n"
 
+        # utils.metrics counters are shared by every session in this process
+        response += "\n⚙️ **Process Statistics (all sessions since startup):**\n"
+        response += (
+            f"  - Score Cache: {metrics.counter('score_cache.hits')} hits, "
+            f"{metrics.counter('score_cache.misses')} misses\n"
+        )
+        parsed = metrics.counter("criteria_parser.parsed")
+        fallbacks = metrics.counter("criteria_parser.fallbacks")
+        if parsed or fallbacks:
+            response += (
+                f"  - Criteria Parsing: {parsed} local, {fallbacks} via LLM "
+                f"({fallbacks / (parsed + fallbacks):.0%} fallback rate, "
+                f"{metrics.summary('criteria_parser.local_ms')['mean']:.2f} ms "
+                f"avg local parse)\n"
+            )
+        prompt_tokens = metrics.summary("prompt.tokens")
+        if prompt_tokens["count"]:
+            response += (
+                f"  - Decision Prompt: ~{prompt_tokens['mean']:.0f} tokens avg, "
+                f"~{prompt_tokens['max']:.0f} max "
+                f"(conversation context ~"
+                f"{metrics.summary('prompt.context_tokens')['mean']:.0f} avg)\n"
+            )
+        save_bytes = metrics.summary("state.save_bytes")
+        if save_bytes["count"]:
+            response += (
+                f"  - State Saves: {save_bytes['mean']:,.0f} bytes/turn avg, "
+                f"{save_bytes['max']:,.0f} max "
+                f"({metrics.counter('state.sub_states_skipped')} unchanged "
+                f"sub-states skipped)\n"
+            )
+
         # State summary
         response += f"\n📋 **Current State:**\n"
         response += (
@@ -1,3 +1,167 @@
+from collections import OrderedDict
+from itertools import islice
+
+from utils import metrics
+from utils.field_index import get_field_index
+from utils.mapping_config import get_mapping_index
+from utils.scoring_engine import get_engine, lru_get, lru_put
+
+# Certificates scored per vectorized engine pass in score_batch
+BATCH_SIZE = 1024
+
+# Recent criterion matches keyed by scoring_fingerprint, least recent evicted
+SCORE_MEMO_SIZE = 128
+_score_memo = OrderedDict()
+
+
+def score_certificate(certificate, criteria):
+    """
+    Score one CertificateState against weighted criteria without touching state.
+
+    Returns:
+        (scores, final_score) where scores holds the weighted per-criterion
+        scores and final_score is their sum divided by the total weight
+    """
+    return get_engine(criteria).score_one(certificate)
+
+
+def scoring_fingerprint(certificate, criteria):
+    """
+    Key covering every matching input: extracted fields, confidence, the
+    criterion names, the raw text the engine falls back to for unmatched
+    criteria and the mapping config version. Weights are left out since
+    they don't affect matching.
+
+    Values are repr'd so unhashable field values still produce a key; the
+    raw text string caches its own hash, so building the key stays cheap.
+    """
+    return (
+        tuple(
+            (name, repr(value)) for name, value in certificate.extracted_fields.items()
+        ),
+        tuple((name, repr(value)) for name, value in certificate.confidence.items()),
+        tuple(criteria),
+        certificate.raw_text,
+        get_mapping_index().version,
+    )
+
+
+def memoized_match(certificate, criteria):
+    """
+    Unweighted scores and matched fields for some criteria, reusing the last
+    result while none of the matching inputs changed.
+
+    Hits and misses are counted under "score_cache" in utils.metrics.
+
+    Returns:
+        (raw_scores, matched_fields) dicts keyed by criterion name
+    """
+    key = scoring_fingerprint(certificate, criteria)
+    cached = lru_get(_score_memo, key)
+    if cached is not None:
+        metrics.increment("score_cache.hits")
+    else:
+        metrics.increment("score_cache.misses")
+        engine = get_engine({name: 1.0 for name in criteria})
+        row = engine.raw_scores([certificate])[0]
+        cached = (
+            {name: float(row[j]) for j, name in enumerate(engine.criteria)},
+            engine.matched_fields(certificate),
+        )
+        lru_put(_score_memo, key, cached, SCORE_MEMO_SIZE)
+    raw_scores, matched_fields = cached
+    # Callers store these on the evaluation state, so hand out copies
+    return dict(raw_scores), {name: list(f) for name, f in matched_fields.items()}
+
+
+def invalidate_scores(evaluation):
+    """Drop stored raw scores, e.g. after the certificate was re-extracted."""
+    evaluation.raw_scores = {}
+    evaluation.matched_fields = {}
+
+
+def update_criteria(evaluation, certificate, criteria):
+    """
+    Apply new criteria to an EvaluationState, redoing only what changed.
+
+    Removed criteria are dropped, added criteria are matched against the
+    certificate (only those), and reweighted criteria reuse their stored
+    raw score. Weighted scores and the final score are then recomputed
+    from raw scores in O(criteria) arithmetic. If the mapping config changed
+    since the raw scores were stored, every criterion is matched again.
+
+    Returns:
+        Dict with the "added", "removed" and "reweighted" criterion names
+    """
+    mapping = get_mapping_index().fingerprint
+    if evaluation.mapping_fingerprint != mapping:
+        invalidate_scores(evaluation)
+        evaluation.mapping_fingerprint = mapping
+
+    old_criteria = evaluation.criteria
+    diff = {
+        "added": [name for name in criteria if name not in evaluation.raw_scores],
+        "removed": [name for name in evaluation.raw_scores if name not in criteria],
+        "reweighted": [
+            name
+            for name in criteria
+            if name in evaluation.raw_scores
+            and old_criteria.get(name) != criteria[name]
+        ],
+    }
+
+    for name in diff["removed"]:
+        evaluation.raw_scores.pop(name, None)
+        evaluation.matched_fields.pop(name, None)
+    if diff["added"]:
+        raw_scores, matched_fields = memoized_match(certificate, diff["added"])
+        evaluation.raw_scores.update(raw_scores)
+        evaluation.matched_fields.update(matched_fields)
+    evaluation.touch("raw_scores", "matched_fields")
+
+    evaluation.criteria = dict(criteria)
+    total_weight = sum(criteria.values())
+    evaluation.scores = {
+        name: evaluation.raw_scores[name] * weight for name, weight in criteria.items()
+    }
+    evaluation.final_score = (
+        sum(evaluation.scores.values()) / total_weight if total_weight > 0 else 0.0
+    )
+    return diff
+
+
+def score_batch(certificates, criteria, leaderboard=None, batch_size=BATCH_SIZE):
+    """
+    Score a stream of certificates, optionally feeding a Leaderboard.
+
+    Certificates are scored batch_size at a time through the compiled
+    ScoringEngine, so the stream is never fully materialised.
+
+    Args:
+        certificates: Iterable of (label, CertificateState) tuples
+        criteria: Dict of criterion name to weight
+        leaderboard: Optional utils.leaderboard.Leaderboard to push results into
+
+    Yields:
+        (label, scores, final_score) for each certificate as it is scored
+    """
+    engine = get_engine(criteria)
+    certificates = iter(certificates)
+    while True:
+        batch = list(islice(certificates, batch_size))
+        if not batch:
+            return
+        weighted, final_scores = engine.score_batch([cert for _, cert in batch])
+        for row, (label, _) in enumerate(batch):
+            scores = {
+                name: float(weighted[row, j]) for j, name in enumerate(engine.criteria)
+            }
+            final_score = float(final_scores[row])
+            if leaderboard is not None:
+                leaderboard.push(label, final_score, scores)
+            yield label, scores, final_score
+
+
 def rescore_certificate(state):
     """
     Rescore certificate based on evaluation criteria and weights.
@@ -7,98 +171,10 @@ def rescore_certificate(state):
 
     # Check if evaluation criteria are defined
     if state["evaluation"].criteria:
-        # Intelligent field mapping for common criteria
-        field_mapping = {
-            "GPA": ["Cumulative GPA", "Major GPA", "GPA"],
-            "gpa": ["Cumulative GPA", "Major GPA", "GPA"],
-            "Academic Performance": [
-                "Cumulative GPA",
-                "Major GPA",
-                "Total Units Completed",
-            ],
-            "academics": ["Cumulative GPA", "Major GPA"],
-            "Research": ["research", "publication", "paper", "lab"],
-            "research experience": ["research", "publication", "paper", "lab"],
-            "Leadership": ["leadership", "president", "vice president", "captain"],
-            "leadership": ["leadership", "president", "vice president", "captain"],
-            "Honors": ["honors", "dean's list", "award", "distinction"],
-            "honors": ["honors", "dean's list", "award", "distinction"],
-            "Institution": ["University", "institution", "college"],
-            "institution": ["University", "institution", "college"],
-            "Degree": ["Degree", "degree type"],
-            "degree type": ["Degree", "degree type"],
-        }
-
-        total_weight = sum(state["evaluation"].criteria.values())
-
-        for criterion, weight in state["evaluation"].criteria.items():
-            # Try to find matching fields
-            criterion_lower = criterion.lower()
-            matched_fields = []
-
-            # Check if criterion has a mapping
-            if criterion in field_mapping:
-                keywords = field_mapping[criterion]
-            elif criterion_lower in field_mapping:
-                keywords = field_mapping[criterion_lower]
-            else:
-                # Use criterion name as keyword
-                keywords = [criterion]
-
-            # Find matching extracted fields
-            for field_name, field_value in state[
-                "certificate"
-            ].extracted_fields.items():
-                for keyword in keywords:
-                    if (
-                        keyword.lower() in field_name.lower()
-                        or keyword.lower() in str(field_value).lower()
-                    ):
-                        if field_name in state["certificate"].confidence:
-                            matched_fields.append(field_name)
-                            break
-
-            # Calculate score based on matched fields
-            if matched_fields:
-                # Use average confidence of matched fields
-                confidences = []
-                for field in matched_fields:
-                    try:
-                        conf = float(state["certificate"].confidence[field])
-                        confidences.append(conf)
-                    except (ValueError, TypeError):
-                        continue
-
-                if confidences:
-                    avg_confidence = sum(confidences) / len(confidences)
-                    # Score = confidence * 100 * weight
-                    scores[criterion] = avg_confidence * 100 * weight
-                else:
-                    scores[criterion] = 50.0 * weight
-            else:
-                # No matching fields found - check if data exists in certificate text
-                cert_text = state["certificate"].raw_text.lower()
-                criterion_in_text = False
-
-                for keyword in keywords:
-                    if keyword.lower() in cert_text:
-                        criterion_in_text = True
-                        break
-
-                if criterion_in_text:
-                    # Data exists but not extracted - use moderate score
-                    scores[criterion] = 70.0 * weight
-                else:
-                    # Data not found - low score
-                    scores[criterion] = 30.0 * weight
-
-        # Calculate weighted final score
-        if total_weight > 0:
-            state["evaluation"].final_score = sum(scores.values()) / total_weight
-        else:
-            state["evaluation"].final_score = 0.0
-
-        state["evaluation"].scores = scores
+        update_criteria(
+            state["evaluation"], state["certificate"], state["evaluation"].criteria
+        )
+        scores = state["evaluation"].scores
 
         # Create detailed response message
         score_details = "\n".join(
@@ -116,12 +192,8 @@ def rescore_certificate(state):
     else:
         # Fallback: Use confidence-based scoring
         if state["certificate"].confidence:
-            for k, conf in state["certificate"].confidence.items():
-                try:
-                    conf_value = float(conf)
-                    scores[k] = conf_value * 100
-                except (ValueError, TypeError):
-                    continue
+            confidence = get_field_index(state["certificate"]).confidence
+            scores = {k: conf_value * 100 for k, conf_value in confidence.items()}
 
             if scores:
                 state["evaluation"].scores = scores
@@ -0,0 +1,113 @@
+import re
+from pathlib import Path
+
+from actions.compare import CORPUS_DIR, load_certificates
+from utils.ingest import (
+    SESSION_DOC_PREFIX,
+    get_corpus_index,
+    ingest_certificate,
+    session_doc_id,
+)
+
+# (name, size, mtime) of every corpus file as of the last sync
+_corpus_signature = None
+
+
+def _signature(corpus_dir):
+    corpus_dir = Path(corpus_dir)
+    if not corpus_dir.is_dir():
+        return ()
+    return tuple(
+        sorted(
+            (p.name, p.stat().st_size, p.stat().st_mtime_ns)
+            for p in corpus_dir.iterdir()
+            if p.suffix.lower() in (".txt", ".json")
+        )
+    )
+
+
+def sync_corpus(corpus_dir=CORPUS_DIR):
+    """
+    Index the corpus files when any of them changed since the last sync;
+    otherwise only picks up other processes' updates. Unchanged files are
+    skipped and documents whose files are gone are removed.
+    """
+    global _corpus_signature
+    index = get_corpus_index()
+    index.refresh()
+    signature = _signature(corpus_dir)
+    if signature == _corpus_signature:
+        return index
+
+    labels = set()
+    for label, certificate in load_certificates(corpus_dir=corpus_dir):
+        if certificate.raw_text.strip():
+            index.add_document(label, certificate.raw_text)
+            labels.add(label)
+    for doc_id in list(index.docs):
+        if not doc_id.startswith(SESSION_DOC_PREFIX) and doc_id not in labels:
+            index.remove_document(doc_id)
+    _corpus_signature = signature
+    return index
+
+
+def _visible(doc_id, own_doc):
+    return doc_id == own_doc or not doc_id.startswith(SESSION_DOC_PREFIX)
+
+
+def search_corpus(state):
+    """
+    Search the corpus and this session's certificate for words,
+    "exact phrases" or prefix*. Other sessions' certificates are never shown.
+    """
+    user_message = state["conversation"].last_user_message
+    query = re.sub(
+        r"^\s*(search( the)?( corpus)?( for)?)\s*", "", user_message, flags=re.I
+    )
+
+    session_id = state["conversation"].session_id
+    ingest_certificate(state["certificate"].raw_text, session_id)
+    index = sync_corpus()
+    own_doc = session_doc_id(session_id)
+    results = [
+        ("current" if doc_id == own_doc else doc_id, line_no, text)
+        for doc_id, line_no, text in (index.search(query) if query.strip() else [])
+        if _visible(doc_id, own_doc)
+    ]
+
+    if not query.strip():
+        state["conversation"].last_agent_message = (
+            "🔎 What should I search for?\n\n"
+            "Examples:\n"
+            "  • 'search machine learning'\n"
+            "  • 'search \"dean's list\"'\n"
+            "  • 'search comput*'"
+        )
+    elif results:
+        documents = sorted({doc_id for doc_id, _, _ in results})
+        lines = [
+            f"  - [{doc_id}:{line_no + 1}] {text.strip()}"
+            for doc_id, line_no, text in results[:20]
+        ]
+        if len(results) > 20:
+            lines.append(f"  ... and {len(results) - 20} more matches")
+        state["conversation"].last_agent_message = (
+            f"🔎 **{len(results)} match(es) for `{query}` "
+            f"in {len(documents)} certificate(s):**\n\n" + "\n".join(lines)
+        )
+    else:
+        state["conversation"].last_agent_message = (
+            f"🔎 No matches for `{query}` across {sum(_visible(doc_id, own_doc) for doc_id in index.docs)} "
+            f"indexed certificate(s)."
+        )
+
+    # Update conversation history
+    state["conversation"].conversation_history.append(
+        {
+            "user": state["conversation"].last_user_message,
+            "agent": state["conversation"].last_agent_message,
+            "action": "search_corpus",
+        }
+    )
+
+    return state
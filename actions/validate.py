@@ -1,14 +1,16 @@
+import time
+
+from actions.score import update_criteria
 from llm.json_utils import safe_json_parse
 from llm.llm_client import get_llm
+from utils import metrics
+from utils.criteria_parser import parse_criteria
 
 llm = get_llm()
 
 
-def validate_criteria(state):
-    """
-    Validate, set, or modify evaluation criteria based on user input.
-    Extracts criteria and weights from conversation context.
-    """
+def _parse_with_llm(state):
+    """LLM round trip for criteria messages the local parser can't read."""
     prompt = f"""
 You are analyzing a user request about evaluation criteria for a certificate.
 
@@ -43,26 +45,68 @@ Example:
 """
 
     result = llm.invoke(prompt)
-    data = safe_json_parse(
+    return safe_json_parse(
         result.content,
         fallback={"criteria": {}, "validation_message": "Failed to parse criteria"},
     )
 
+
+def validate_criteria(state):
+    """
+    Validate, set, or modify evaluation criteria based on user input.
+    Extracts criteria and weights from conversation context.
+
+    Plain lists, percentages, ratios and "change X to N%" are parsed
+    locally; only messages the parser doesn't understand go to the LLM.
+    """
+    started = time.perf_counter()
+    data = parse_criteria(
+        state["conversation"].last_user_message, state["evaluation"].criteria
+    )
+    metrics.observe("criteria_parser.local_ms", (time.perf_counter() - started) * 1000)
+
+    if data is None:
+        metrics.increment("criteria_parser.fallbacks")
+        started = time.perf_counter()
+        data = _parse_with_llm(state)
+        metrics.observe(
+            "criteria_parser.llm_ms", (time.perf_counter() - started) * 1000
+        )
+    else:
+        metrics.increment("criteria_parser.parsed")
+
     new_criteria = data.get("criteria", {})
     validation_msg = data.get("validation_message", "Criteria updated")
 
     # Update evaluation state with new criteria
     if new_criteria:
-        state["evaluation"].criteria = new_criteria
-
         criteria_list = "\n".join(
             [f"  - {k}: weight={v:.2f}" for k, v in new_criteria.items()]
         )
 
+        # Already scored: keep the score current, matching only new criteria
+        if state["evaluation"].raw_scores:
+            previous_score = state["evaluation"].final_score
+            diff = update_criteria(
+                state["evaluation"], state["certificate"], new_criteria
+            )
+            changes = ", ".join(
+                f"{len(diff[kind])} {kind}" for kind in diff if diff[kind]
+            )
+            score_note = (
+                f"**Updated Score: {state['evaluation'].final_score:.1f}/100** "
+                f"(was {previous_score:.1f}; {changes or 'no changes'})\n"
+            )
+        else:
+            state["evaluation"].criteria = new_criteria
+            score_note = (
+                "The certificate will now be evaluated based on these criteria.\n"
+            )
+
         state["conversation"].last_agent_message = (
             f"✓ {validation_msg}\n\n"
             f"**Active Evaluation Criteria:**\n{criteria_list}\n\n"
-            f"The certificate will now be evaluated based on these criteria.\n"
+            f"{score_note}"
             f"You can modify criteria anytime or ask me to re-score the certificate."
         )
     else:
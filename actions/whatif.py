@@ -0,0 +1,185 @@
+import re
+
+import numpy as np
+
+from actions.compare import CURRENT_LABEL, load_certificates
+from utils.mapping_config import get_mapping_index
+from utils.scoring_engine import get_engine
+from utils.weight_sweep import (
+    break_even_weights,
+    dirichlet_weights,
+    final_scores,
+    normalize_weights,
+    rank_stability,
+    reweight,
+    weight_grid,
+)
+
+# Exhaustive grid up to this many criteria, Dirichlet samples beyond
+GRID_MAX_CRITERIA = 4
+GRID_STEP = 0.1
+SWEEP_SAMPLES = 2000
+
+# How tightly "nearby" samples cluster around the current weights
+LOCAL_CONCENTRATION = 50.0
+
+TARGET_RE = re.compile(
+    r"\b(?:reach|target|threshold|hit|above|get to)\D{0,12}(\d+(?:\.\d+)?)", re.I
+)
+
+
+def _weight_value(number, percent):
+    value = float(number)
+    return value / 100 if percent or value > 1 else value
+
+
+def parse_weight_changes(message, criteria):
+    """
+    Explicit weights named in a what-if question, e.g. "GPA were 50%".
+
+    Returns:
+        Dict of criterion name to weight in [0, 1]
+    """
+    changes = {}
+    for name in criteria:
+        match = re.search(
+            rf"{re.escape(name)}\W+(?:(?:weight|weighted|were|was|is|at|to|of|be|=)\W*)*"
+            r"(\d+(?:\.\d+)?)\s*(%)?",
+            message,
+            re.I,
+        )
+        if match:
+            value = _weight_value(match.group(1), match.group(2))
+            if 0 <= value <= 1:
+                changes[name] = value
+    return changes
+
+
+def _sweep_weights(n_criteria):
+    if n_criteria <= GRID_MAX_CRITERIA:
+        return weight_grid(n_criteria, GRID_STEP), "grid"
+    return dirichlet_weights(n_criteria, SWEEP_SAMPLES), "random"
+
+
+def what_if_weights(state):
+    """
+    Answer "what if the weights were different?" without another LLM call.
+
+    Raw criterion scores are computed once; every alternative weighting
+    (explicit changes, a sweep over the weight simplex, break-even points)
+    is then just arithmetic on them.
+    """
+    user_message = state["conversation"].last_user_message
+    criteria = state["evaluation"].criteria
+
+    if not criteria:
+        state["conversation"].last_agent_message = (
+            "⚠️ No evaluation criteria set yet - what-if analysis varies their weights.\n"
+            "For example: 'Set criteria to GPA 40%, Research 30%, Leadership 30%'"
+        )
+    else:
+        names = list(criteria)
+        base = normalize_weights(list(criteria.values()))
+        others = load_certificates()
+
+        # Raw scores kept by the last rescore, else one engine pass
+        stored = state["evaluation"].raw_scores
+        current_mapping = (
+            state["evaluation"].mapping_fingerprint == get_mapping_index().fingerprint
+        )
+        if current_mapping and all(name in stored for name in names):
+            current = np.asarray([stored[name] for name in names])
+        else:
+            current = get_engine(criteria).raw_scores([state["certificate"]])[0]
+        raw = current[None, :]
+        if others:
+            corpus = get_engine(criteria).raw_scores([cert for _, cert in others])
+            raw = np.vstack([raw, corpus])
+        current_final = float(final_scores(current, base))
+
+        response = (
+            f"🔀 **What-if Analysis**\n\n"
+            f"Current weights: "
+            f"{', '.join(f'{n} {w:.0%}' for n, w in zip(names, base))}\n"
+            f"Current score: **{current_final:.1f}/100**\n\n"
+        )
+
+        # Explicit what-if weights from the message
+        changes = parse_weight_changes(user_message, criteria)
+        if changes:
+            new_weights = reweight(criteria, changes)
+            new_final = float(final_scores(current, list(new_weights.values())))
+            response += (
+                "**With your weights:** "
+                + ", ".join(f"{n} {w:.0%}" for n, w in new_weights.items())
+                + f"\n  → score {new_final:.1f}/100 "
+                f"({new_final - current_final:+.1f} points)\n\n"
+            )
+
+        # Sweep: nearby weightings and the whole simplex
+        sweep, kind = _sweep_weights(len(names))
+        nearby = dirichlet_weights(
+            len(names), SWEEP_SAMPLES, LOCAL_CONCENTRATION, center=base
+        )
+        all_finals = final_scores(current, sweep)
+        near_finals = final_scores(current, nearby)
+        low, high = np.percentile(near_finals, [5, 95])
+        response += (
+            f"**Sensitivity** ({len(sweep)} {kind} weightings):\n"
+            f"  - Near the current weights (90% range): {low:.1f} – {high:.1f}\n"
+            f"  - Any weighting: {all_finals.min():.1f} – {all_finals.max():.1f}\n"
+        )
+        for j, name in enumerate(names):
+            rest = base.copy()
+            rest[j] = 0
+            slope = (current[j] - float(final_scores(current, rest))) * 0.1
+            response += f"  - +10% on {name}: {slope:+.1f} points\n"
+
+        # Break-even weights for a requested target score
+        target = TARGET_RE.search(user_message)
+        if target:
+            goal = float(target.group(1))
+            response += f"\n**Break-even weights for {goal:.1f}:**\n"
+            for name, weight in zip(names, break_even_weights(current, base, goal)):
+                if np.isnan(weight):
+                    response += f"  - {name}: out of reach\n"
+                else:
+                    response += f"  - {name}: {weight:.0%}\n"
+
+        # Rank stability against the corpus
+        if others:
+            labels = [CURRENT_LABEL] + [label for label, _ in others]
+            stability = rank_stability(raw, sweep, base)
+            response += (
+                f"\n**Rank among {len(labels)} certificates:** "
+                f"{stability['base_rank'][0]} now, "
+                f"{stability['best_rank'][0]}–{stability['worst_rank'][0]} across "
+                f"weightings (unchanged in {stability['stability'][0]:.0%})\n"
+            )
+            finals = final_scores(raw, base)
+            ahead = np.nonzero(finals[1:] > finals[0])[0] + 1
+            if ahead.size:
+                rival = ahead[np.argmin(finals[ahead])]
+                swap = break_even_weights(raw[0] - raw[rival], base, 0.0)
+                reachable = [
+                    f"{name} {weight:.0%}"
+                    for name, weight in zip(names, swap)
+                    if not np.isnan(weight)
+                ]
+                response += f"  - To overtake {labels[rival]}: " + (
+                    ", ".join(reachable) if reachable else "no single weight change"
+                )
+                response += "\n"
+
+        state["conversation"].last_agent_message = response
+
+    # Update conversation history
+    state["conversation"].conversation_history.append(
+        {
+            "user": state["conversation"].last_user_message,
+            "agent": state["conversation"].last_agent_message,
+            "action": "what_if",
+        }
+    )
+
+    return state
@@ -6,10 +6,14 @@ from actions.extract import extract_information
 from actions.history import show_history
 from actions.pause import pause_execution
 from actions.score import rescore_certificate
+from actions.search import search_corpus
 from actions.validate import validate_criteria
+from actions.whatif import what_if_weights
 from agent.prompts import AGENT_DECISION_PROMPT
 from llm.json_utils import safe_json_parse
 from llm.llm_client import get_llm_with_fallback
+from utils.conversation_memory import build_context, record_prompt_size
+from utils.intents import intent_features
 
 
 def agent_node(state):
@@ -28,6 +32,9 @@ def agent_node(state):
 User Input:
 {state["conversation"].last_user_message}
 
+Detected Intents (keyword features, 1 = present):
+{format_intents(state["conversation"].last_user_message)}
+
 === CURRENT STATE (CHECK THIS CAREFULLY!) ===
 
 Certificate State:
@@ -43,7 +50,8 @@ Evaluation State:
 
 Conversation State:
 - History Length: {history_count}
-- Recent Context: {state["conversation"].conversation_history[-2:] if history_count > 0 else "NO HISTORY"}
+- Conversation Memory:
+{build_context(state["conversation"])}
 
 === CRITICAL DECISION LOGIC ===
 - If user asks for info AND extracted_count = 0 → choose "extract_information" (NOT answer_from_state)
@@ -53,6 +61,8 @@ Conversation State:
 - If user asks to score AND criteria_count > 0 → choose "rescore"
 """
 
+    record_prompt_size(decision_prompt)
+
     # Get LLM decision with safe parsing - use dynamic LLM with fallback
     try:
         llm = get_llm_with_fallback()
@@ -100,12 +110,23 @@ Conversation State:
         state = ask_clarification(state)
     elif action == "compare_certificates":
         state = compare_certificates(state)
+    elif action == "search_corpus":
+        state = search_corpus(state)
+    elif action == "what_if":
+        state = what_if_weights(state)
     elif action == "pause":
         state = pause_execution(state)
     else:  # Default to explain
         return explain_decision(state)
 
 
+def format_intents(message):
+    """Intent feature vector as a compact prompt line."""
+    return ", ".join(
+        f"{intent}={value}" for intent, value in intent_features(message).items()
+    )
+
+
 def _handle_llm_failure(state, error_msg):
     """Handle case when all LLM models are exhausted."""
     state["conversation"].last_agent_message = (
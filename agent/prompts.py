@@ -97,7 +97,18 @@ For casual conversation:
    - When: User asks how this compares to others
    - Examples: "compare to another certificate", "how does this rank"
 
-10. **pause**
+10. **search_corpus**
+   - When: User wants to search certificate text for words or phrases
+   - When: User asks which certificates mention something
+   - Examples: "search machine learning", "which certificates mention dean's list"
+
+11. **what_if**
+   - When: User asks how the score WOULD change under different weights
+   - When: User asks how sensitive the score or rank is to the weights
+   - Examples: "what if GPA were 50%?", "how sensitive is my score to the weights", "what weight would Research need to reach 80"
+   - Does NOT change the criteria - use validate_criteria to actually change weights
+
+12. **pause**
    - When: User explicitly asks to pause or wait
    - When: Significant action needs confirmation
    - Examples: "pause", "wait", "let me think"
@@ -139,6 +150,7 @@ For casual conversation:
   - If NO criteria → choose **ask_clarification** (need criteria first)
 - If user says "set criteria to X, Y, Z" or "evaluate based on X" → choose **validate_criteria**
 - If user says "change weight to X%" → choose **validate_criteria**
+- If user asks "what if X were Y%?" → choose **what_if** (hypothetical, criteria unchanged)
 - If user says "extract", "parse", "read" → choose **extract_information**
 - If user says "why", "how", "explain" → choose **explain**
 - If unclear about a TASK → choose **ask_clarification**
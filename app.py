@@ -1,5 +1,6 @@
 import os
 import sys
+import uuid
 
 # Add project directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -12,6 +13,7 @@ from state.certificate_state import CertificateState
 from state.conversation_state import ConversationState
 from state.evaluation_state import EvaluationState
 from state.global_state import GlobalState
+from utils.ingest import ingest_certificate
 from utils.state_manager import StateManager
 
 # Load environment variables
@@ -231,8 +233,17 @@ st.markdown(
 
 # Initialize session state
 def init_session_state():
+    if "session_id" not in st.session_state:
+        # One saved session per browser session; the ID rides in the URL so
+        # a page reload resumes it instead of starting over
+        session_id = st.query_params.get("session") or uuid.uuid4().hex
+        st.query_params["session"] = session_id
+        st.session_state.session_id = session_id
+
     if "state_manager" not in st.session_state:
-        st.session_state.state_manager = StateManager()
+        st.session_state.state_manager = StateManager(
+            session_id=st.session_state.session_id
+        )
 
     if "graph" not in st.session_state:
         st.session_state.graph = build_graph()
@@ -266,6 +277,12 @@ def init_session_state():
             except FileNotFoundError:
                 pass
 
+        # Index the certificate text for search and near-duplicate detection
+        ingest_certificate(
+            st.session_state.state["certificate"].raw_text,
+            st.session_state.session_id,
+        )
+
 
 if hasattr(st, "session_state"):
     init_session_state()
@@ -344,7 +361,7 @@ with st.sidebar:
         st.session_state.state_manager.clear_session()
         st.session_state.state = {
             "certificate": CertificateState(),
-            "conversation": ConversationState(),
+            "conversation": ConversationState(session_id=st.session_state.session_id),
             "evaluation": EvaluationState(),
         }
         st.session_state.messages = []
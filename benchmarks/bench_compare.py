@@ -0,0 +1,77 @@
+"""
+Benchmark the comparison ranking (batch scoring into a top-k leaderboard)
+against scoring certificates one at a time and sorting them all.
+
+Usage:
+    python benchmarks/bench_compare.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from actions.compare import COMPARE_TOP_K, rank_certificates  # noqa: E402
+from state.certificate_state import CertificateState  # noqa: E402
+from utils.scoring_engine import get_engine  # noqa: E402
+
+CRITERIA = {"GPA": 0.4, "Research": 0.3, "Leadership": 0.3}
+
+
+def synthetic_certificates(n, rng):
+    certificates = []
+    for i in range(n):
+        fields = {
+            "Cumulative GPA": f"3.{i % 10}",
+            "Research Experience": f"Research assistant in lab {i}",
+            "Extracurricular Activities": f"President of club {i}",
+        }
+        confidence = {name: float(rng.uniform(0.5, 1.0)) for name in fields}
+        certificates.append(
+            (
+                f"cert_{i}",
+                CertificateState(
+                    raw_text=" ".join(fields.values()),
+                    extracted_fields=fields,
+                    confidence=confidence,
+                ),
+            )
+        )
+    return certificates
+
+
+def loop_ranking(certificates, criteria, k=COMPARE_TOP_K):
+    """Reference: score each certificate on its own, then sort all of them."""
+    engine = get_engine(criteria)
+    results = [(engine.score_one(cert)[1], label) for label, cert in certificates]
+    results.sort(key=lambda result: -result[0])
+    return results[:k]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for n in (100, 1_000, 5_000):
+        certificates = synthetic_certificates(n, rng)
+
+        start = time.perf_counter()
+        leaders, _ = rank_certificates(certificates, CRITERIA)
+        batched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = loop_ranking(certificates, CRITERIA)
+        looped = time.perf_counter() - start
+
+        assert np.allclose(
+            [entry.final_score for entry in leaders], [score for score, _ in expected]
+        )
+        print(
+            f"n={n:>6}  batched {batched * 1000:8.2f} ms  "
+            f"loop {looped * 1000:8.2f} ms ({looped / batched:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
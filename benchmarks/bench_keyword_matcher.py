@@ -0,0 +1,82 @@
+"""
+Micro-benchmark the Aho-Corasick KeywordMatcher against `keyword in text` loops.
+
+Usage:
+    python benchmarks/bench_keyword_matcher.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.keyword_matcher import KeywordMatcher  # noqa: E402
+from utils.mapping_config import get_mapping_index  # noqa: E402
+
+INDEX = get_mapping_index()
+
+MESSAGES = {
+    "short message": "what's the gpa on this certificate?",
+    "long message": "could you tell me " * 20 + "about their research lab work",
+}
+FIELD_VALUE = (
+    "Undergraduate Research Assistant, Berkeley AI Research (BAIR) Lab, "
+    "Published paper: Deep Learning Approaches for Natural Language Understanding"
+)
+
+
+def loop_topic(message):
+    for topic, keywords in INDEX.topics.items():
+        if any(keyword in message for keyword in keywords):
+            return topic
+    return None
+
+
+def matcher_topic(message):
+    asked = INDEX.topic_matcher.mask(message)
+    for topic, topic_mask in INDEX.topic_masks.items():
+        if asked & topic_mask:
+            return topic
+    return None
+
+
+def report(label, loop, *variants, number=20_000):
+    loop_us = timeit.timeit(loop, number=number) / number * 1e6
+    line = f"{label:<30} loop {loop_us:7.2f} us"
+    for name, func in variants:
+        us = timeit.timeit(func, number=number) / number * 1e6
+        line += f"  {name} {us:7.2f} us ({loop_us / us:4.1f}x)"
+    print(line)
+
+
+def main():
+    for label, message in MESSAGES.items():
+        assert loop_topic(message) == matcher_topic(message)
+        report(
+            f"answer topics, {label}",
+            lambda: loop_topic(message),
+            ("matcher", lambda: matcher_topic(message)),
+        )
+
+    lowered = FIELD_VALUE.lower()
+    for count in (16, 128, 512):
+        keywords = sorted(
+            {k.lower() for ks in INDEX.field_mapping.values() for k in ks}
+        )
+        keywords += [f"keyword{i}" for i in range(count - len(keywords))]
+        direct = KeywordMatcher(keywords, use_automaton=False)
+        automaton = KeywordMatcher(keywords, use_automaton=True)
+        assert automaton.find_all(FIELD_VALUE) == {k for k in keywords if k in lowered}
+        assert direct.mask(FIELD_VALUE) == automaton.mask(FIELD_VALUE)
+        report(
+            f"{len(keywords)} keywords, one field",
+            lambda: [k for k in keywords if k.lower() in FIELD_VALUE.lower()],
+            ("direct", lambda: direct.mask(FIELD_VALUE)),
+            ("automaton", lambda: automaton.mask(FIELD_VALUE)),
+            number=5_000,
+        )
+
+
+if __name__ == "__main__":
+    main()
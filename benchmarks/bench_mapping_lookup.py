@@ -0,0 +1,130 @@
+"""
+Per-call overhead of criterion/topic lookups: tables rebuilt as literal dicts
+on every call (the old code) versus the compiled, hot-reloadable MappingIndex.
+
+Usage:
+    python benchmarks/bench_mapping_lookup.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.mapping_config as mapping_config  # noqa: E402
+
+CRITERIA = ["GPA", "research experience", "Leadership", "Community Service"]
+MESSAGES = [
+    "what's the gpa on this certificate?",
+    "tell me about their leadership roles",
+    "is this a good candidate?",
+]
+
+
+def legacy_criterion_keywords(criterion):
+    """Reference: the literal table rebuilt per call, with case variants."""
+    field_mapping = {
+        "GPA": ["Cumulative GPA", "Major GPA", "GPA"],
+        "gpa": ["Cumulative GPA", "Major GPA", "GPA"],
+        "Academic Performance": [
+            "Cumulative GPA",
+            "Major GPA",
+            "Total Units Completed",
+        ],
+        "academics": ["Cumulative GPA", "Major GPA"],
+        "Research": ["research", "publication", "paper", "lab"],
+        "research experience": ["research", "publication", "paper", "lab"],
+        "Leadership": ["leadership", "president", "vice president", "captain"],
+        "leadership": ["leadership", "president", "vice president", "captain"],
+        "Honors": ["honors", "dean's list", "award", "distinction"],
+        "honors": ["honors", "dean's list", "award", "distinction"],
+        "Institution": ["University", "institution", "college"],
+        "institution": ["University", "institution", "college"],
+        "Degree": ["Degree", "degree type"],
+        "degree type": ["Degree", "degree type"],
+    }
+    if criterion in field_mapping:
+        return field_mapping[criterion]
+    if criterion.lower() in field_mapping:
+        return field_mapping[criterion.lower()]
+    return [criterion]
+
+
+def legacy_topic(message):
+    """Reference: the literal topic table rebuilt per call and scanned."""
+    asking_about = {
+        "name": ["name", "student name", "whose certificate", "who is"],
+        "gpa": ["gpa", "grade point", "grades", "cumulative gpa", "major gpa"],
+        "degree": ["degree", "what degree", "major", "field of study"],
+        "university": ["university", "institution", "school", "college", "where did"],
+        "graduation": [
+            "graduation",
+            "graduated",
+            "conferred",
+            "completion date",
+            "when did",
+        ],
+        "score": [
+            "what score",
+            "current score",
+            "total score",
+            "final score",
+            "rating",
+        ],
+        "criteria": ["what criteria", "evaluation criteria", "what factors"],
+        "honors": ["honors", "awards", "distinctions", "achievements"],
+        "research": ["research", "publications", "papers", "lab"],
+        "leadership": ["leadership", "president", "vice president", "officer"],
+    }
+    for topic, keywords in asking_about.items():
+        if any(keyword in message for keyword in keywords):
+            return topic
+    return None
+
+
+def indexed_criterion_keywords(criterion):
+    return mapping_config.get_mapping_index().criterion_keywords(criterion)
+
+
+def indexed_topic(message):
+    return mapping_config.get_mapping_index().topic_of(message)
+
+
+def per_call_us(func, inputs, number):
+    total = timeit.timeit(lambda: [func(x) for x in inputs], number=number)
+    return total / number / len(inputs) * 1e6
+
+
+def main(number=20_000):
+    for criterion in CRITERIA:
+        assert list(legacy_criterion_keywords(criterion)) == list(
+            indexed_criterion_keywords(criterion)
+        ), criterion
+    for message in MESSAGES:
+        assert legacy_topic(message) == indexed_topic(message), message
+
+    interval = mapping_config.RELOAD_INTERVAL
+    for label, legacy, indexed, inputs in (
+        (
+            "criterion keywords",
+            legacy_criterion_keywords,
+            indexed_criterion_keywords,
+            CRITERIA,
+        ),
+        ("topic detection", legacy_topic, indexed_topic, MESSAGES),
+    ):
+        before = per_call_us(legacy, inputs, number)
+        after = per_call_us(indexed, inputs, number)
+        # Worst case: the reload check stats the config file on every call
+        mapping_config.RELOAD_INTERVAL = 0.0
+        polled = per_call_us(indexed, inputs, number // 10)
+        mapping_config.RELOAD_INTERVAL = interval
+        print(
+            f"{label:<20} literal {before:6.2f} us  index {after:6.2f} us "
+            f"({before / after:4.1f}x)  index+stat {polled:6.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
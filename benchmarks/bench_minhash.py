@@ -0,0 +1,76 @@
+"""
+Benchmark MinHash/LSH near-duplicate lookup on synthetic certificate corpora.
+
+Usage:
+    python benchmarks/bench_minhash.py [corpus_size ...]
+
+Defaults to corpus sizes of 1,000, 10,000 and 100,000. Brute-force
+signature comparison is timed alongside the LSH query for reference.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.minhash import (  # noqa: E402
+    NearDuplicateIndex,
+    estimate_similarity,
+    minhash_signature,
+)
+
+VOCABULARY = [f"w{i}" for i in range(5000)]
+
+
+def synthetic_certificate(rng, length=80):
+    return " ".join(rng.choice(VOCABULARY, size=length))
+
+
+def reformat(text):
+    """Same certificate with whitespace and casing changes."""
+    return "\n\n  ".join(text.upper().split(" "))
+
+
+def main(sizes):
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        texts = [synthetic_certificate(rng) for _ in range(n)]
+
+        start = time.perf_counter()
+        signatures = [minhash_signature(text) for text in texts]
+        signing = time.perf_counter() - start
+
+        index = NearDuplicateIndex()
+        start = time.perf_counter()
+        for i, signature in enumerate(signatures):
+            index.add(i, signature)
+        building = time.perf_counter() - start
+
+        probes = rng.integers(0, n, size=100)
+        queries = [minhash_signature(reformat(texts[i])) for i in probes]
+
+        start = time.perf_counter()
+        found = sum(
+            1
+            for i, query in zip(probes, queries)
+            if index.query(query)[:1] == [(i, 1.0)]
+        )
+        lsh_query = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        for query in queries[:5]:
+            max(signatures, key=lambda s: estimate_similarity(query, s))
+        brute_query = (time.perf_counter() - start) / 5
+
+        print(
+            f"n={n:>7}  sign {signing / n * 1e6:6.1f} us/doc  "
+            f"build {building:6.2f} s  lsh query {lsh_query * 1e3:7.3f} ms  "
+            f"brute query {brute_query * 1e3:9.2f} ms  recall {found}/{len(queries)}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,84 @@
+"""
+Time to restore a saved session and to read its summary, with histories
+read eagerly vs deferred until first use, across session lengths.
+
+Usage:
+    python benchmarks/bench_session_load.py
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state.certificate_state import CertificateState  # noqa: E402
+from state.conversation_state import ConversationState  # noqa: E402
+from state.evaluation_state import EvaluationState  # noqa: E402
+from utils.state_manager import StateManager, restore_state  # noqa: E402
+
+TURNS = (100, 1000, 5000)
+AGENT_MESSAGE = "✓ Certificate re-scored based on current criteria:\n\n" + (
+    "  - GPA: 38.5 (weight: 0.40)\n" * 6
+)
+
+
+def new_state():
+    return {
+        "certificate": CertificateState(),
+        "conversation": ConversationState(),
+        "evaluation": EvaluationState(),
+    }
+
+
+def build_session(state_dir, turns):
+    manager = StateManager(state_dir, background=False)
+    state = new_state()
+    state["certificate"].raw_text = "GPA: 3.85/4.0\nResearch: 2 papers\n" * 50
+    manager.save_state(state)
+    for i in range(turns):
+        state["conversation"].last_user_message = f"rescore please ({i})"
+        state["conversation"].conversation_history.append(
+            {
+                "user": f"rescore please ({i})",
+                "agent": AGENT_MESSAGE,
+                "action": "rescore",
+            }
+        )
+        state["conversation"].reasoning_history.append(
+            {"decision": "rescore", "reason": "Criteria are set", "uncertainty": ""}
+        )
+        manager.save_state(state)
+    return manager
+
+
+def time_ms(func, number):
+    return timeit.timeit(func, number=number) / number * 1000
+
+
+def main(number=20):
+    print(f"{'turns':>6}{'eager ms':>10}{'deferred ms':>13}{'summary ms':>12}")
+    for turns in TURNS:
+        with tempfile.TemporaryDirectory() as state_dir:
+            manager = build_session(state_dir, turns)
+
+            def eager():
+                state_data, _ = manager.store.read_session(manager.session_id)
+                restore_state(new_state(), state_data)
+
+            def deferred():
+                state_data, _ = manager.store.read_session(
+                    manager.session_id, histories=False
+                )
+                restore_state(new_state(), state_data)
+
+            print(
+                f"{turns:>6}{time_ms(eager, number):>10.2f}"
+                f"{time_ms(deferred, number):>13.2f}"
+                f"{time_ms(manager.get_session_summary, number):>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Encode/decode time and size of saved session state per codec, against the
+old format (json.dump with indent=2), across session lengths.
+
+Usage:
+    python benchmarks/bench_state_codec.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.bounded_history as bounded_history  # noqa: E402
+from state.certificate_state import CertificateState  # noqa: E402
+from state.conversation_state import ConversationState  # noqa: E402
+from state.evaluation_state import EvaluationState  # noqa: E402
+from utils.codec import available_codecs, get_codec  # noqa: E402
+from utils.state_manager import state_to_saved  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+TURNS = (10, 100, 1000)
+AGENT_MESSAGE = (
+    "📊 **Certificate Evaluation Complete**\n\n"
+    + "• GPA: 3.85/4.0 → 96.3/100 (weight 40%)\n" * 6
+    + "\n💡 Ask me to explain any criterion or change the weights."
+)
+
+
+def build_state(turns):
+    raw_text = (ROOT / "data" / "certificate.txt").read_text()
+    state = {
+        "certificate": CertificateState(
+            raw_text=raw_text,
+            extracted_fields={f"Field {i}": f"value {i}" for i in range(12)},
+            confidence={f"Field {i}": 0.9 for i in range(12)},
+        ),
+        "conversation": ConversationState(),
+        "evaluation": EvaluationState(
+            criteria={"GPA": 0.4, "Research": 0.3, "Leadership": 0.3},
+            scores={"GPA": 96.3, "Research": 80.0, "Leadership": 70.0},
+            final_score=83.5,
+        ),
+    }
+    for i in range(turns):
+        state["conversation"].conversation_history.append(
+            {
+                "user": f"score my certificate ({i})",
+                "agent": AGENT_MESSAGE,
+                "action": "rescore",
+            }
+        )
+        state["conversation"].reasoning_history.append(
+            {
+                "decision": "rescore",
+                "reason": "User asked for a score and criteria are set",
+                "uncertainty": "",
+                "context": f"User said: score my certificate ({i})",
+            }
+        )
+    return state
+
+
+def time_ms(func, number):
+    return timeit.timeit(func, number=number) / number * 1000
+
+
+def main(number=50):
+    with tempfile.TemporaryDirectory() as spill_dir:
+        # Long sessions spill history entries; keep them out of session_data
+        bounded_history.SPILL_DIR = Path(spill_dir)
+        for turns in TURNS:
+            data = state_to_saved(build_state(turns))
+            legacy = json.dumps(data, indent=2).encode()
+            print(f"\n{turns} turns (legacy json indent=2: {len(legacy):,} bytes)")
+            print(
+                f"  {'codec':<16}{'encode ms':>10}{'decode ms':>10}{'bytes':>10}{'size':>8}"
+            )
+            rows = [
+                (
+                    "legacy",
+                    lambda: json.dumps(data, indent=2).encode(),
+                    lambda: json.loads(legacy),
+                    legacy,
+                )
+            ]
+            for name in available_codecs():
+                codec = get_codec(name)
+                encoded = codec.encode(data)
+                assert codec.decode(encoded) == json.loads(legacy), name
+                rows.append(
+                    (
+                        name,
+                        lambda codec=codec: codec.encode(data),
+                        lambda codec=codec, encoded=encoded: codec.decode(encoded),
+                        encoded,
+                    )
+                )
+            for name, encode, decode, encoded in rows:
+                print(
+                    f"  {name:<16}{time_ms(encode, number):>10.3f}"
+                    f"{time_ms(decode, number):>10.3f}{len(encoded):>10,}"
+                    f"{len(encoded) / len(legacy):>8.0%}"
+                )
+
+
+if __name__ == "__main__":
+    main()
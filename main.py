@@ -1,10 +1,19 @@
+import re
+
+from actions.history import render_history_page
+from actions.search import search_corpus
 from graph.graph import build_graph
 from state.certificate_state import CertificateState
 from state.conversation_state import ConversationState
 from state.evaluation_state import EvaluationState
 from state.global_state import GlobalState
+from utils.ingest import ingest_certificate
 from utils.state_manager import StateManager
 
+# Only these exact forms show history; other messages starting with
+# "history" ("history of my scores?") go to the agent
+HISTORY_COMMAND_RE = re.compile(r"history(?:\s+(?:page\s+)?(\d+))?", re.IGNORECASE)
+
 # Initialize state manager for persistence
 state_manager = StateManager()
 
@@ -38,6 +47,9 @@ if not state["certificate"].raw_text:
 else:
     print("✓ Using certificate data from previous session")
 
+# Index the certificate text for search and near-duplicate detection
+ingest_certificate(state["certificate"].raw_text, state_manager.session_id)
+
 # Build the agent graph
 graph = build_graph()
 
@@ -61,9 +73,10 @@ print("  • Challenge or correct my assessments")
 print("  • View conversation history")
 print("\nCommands:")
 print("  • 'exit' - Quit (your session is auto-saved)")
-print("  • 'history' - See conversation history")
+print("  • 'history [page]' - See conversation history, a page at a time")
 print("  • 'clear' - Start fresh session")
 print("  • 'status' - Show current session info")
+print("  • 'search <query>' - Search certificate text (\"phrases\", prefix*)")
 print("=" * 70 + "\n")
 
 # Show session info if continuing
@@ -84,18 +97,23 @@ while True:
         # Save state before exiting
         print("\n💾 Saving session...")
         if state_manager.save_state(state):
+            # Saves are written in the background; wait for them to land
+            state_manager.flush()
             print("✓ Session saved successfully!")
         print("👋 Goodbye! Your session is saved and will be restored next time.")
         break
 
-    if user_input.lower() == "history":
-        print("\n📜 Conversation History:")
-        print("-" * 70)
+    history_command = HISTORY_COMMAND_RE.fullmatch(user_input.strip())
+    if history_command:
+        # "history" shows the latest page, "history 2" / "history page 2" others
+        page_arg = history_command.group(1)
+        page = int(page_arg) if page_arg else None
+        print()
         if state["conversation"].conversation_history:
-            for i, exchange in enumerate(state["conversation"].conversation_history, 1):
-                print(f"\n[{i}] Action: {exchange.get('action', 'unknown')}")
-                print(f"    You: {exchange.get('user', '')[:100]}...")
-                print(f"    Agent: {exchange.get('agent', '')[:150]}...")
+            for chunk in render_history_page(
+                state["conversation"].conversation_history, page
+            ):
+                print(chunk, end="")
         else:
             print("No history yet - start a conversation!")
         print("-" * 70)
@@ -107,7 +125,7 @@ while True:
             state_manager.clear_session()
             state = {
                 "certificate": CertificateState(),
-                "conversation": ConversationState(),
+                "conversation": ConversationState(session_id=state_manager.session_id),
                 "evaluation": EvaluationState(),
             }
             # Reload certificate
@@ -125,6 +143,13 @@ while True:
         print("\n" + state_manager.get_session_summary())
         continue
 
+    if user_input.lower().startswith("search "):
+        state["conversation"].last_user_message = user_input
+        state = search_corpus(state)
+        print(f"\n🤖 Agent: {state['conversation'].last_agent_message}")
+        state_manager.save_state(state)
+        continue
+
     if not user_input.strip():
         print("⚠️  Please enter a message.")
         continue
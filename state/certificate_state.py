@@ -1,9 +1,14 @@
-from typing import Dict
+from typing import Any, Dict
 
-from pydantic import BaseModel
+from pydantic import PrivateAttr
 
+from state.tracked_state import TrackedState
 
-class CertificateState(BaseModel):
+
+class CertificateState(TrackedState):
     raw_text: str = ""
     extracted_fields: Dict[str, str] = {}
     confidence: Dict[str, float] = {}
+
+    # Derived lookups (utils.field_index); private, so never serialized
+    _field_index: Any = PrivateAttr(default=None)
@@ -1,9 +1,20 @@
 from typing import Dict, List
 
-from pydantic import BaseModel
+from pydantic import ConfigDict, Field, field_validator
 
+from state.tracked_state import TrackedState
+from utils.bounded_history import BoundedHistory
+
+# Entry field each history keeps running counts of
+HISTORY_COUNT_KEYS = {"conversation": "action", "reasoning": "decision"}
+
+
+class ConversationState(TrackedState):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    # Session this conversation belongs to (StateManager.session_id)
+    session_id: str = ""
 
-class ConversationState(BaseModel):
     # Messages
     last_user_message: str = ""
     last_agent_message: str = ""
@@ -16,6 +27,30 @@ class ConversationState(BaseModel):
     last_user_intent: str = ""
     pending_confirmation: bool = False
 
-    # Conversation history for context persistence
-    conversation_history: List[Dict[str, str]] = []
-    reasoning_history: List[Dict[str, str]] = []
+    # Conversation history for context persistence; only a recent window
+    # stays in memory, older entries are paged in from disk
+    conversation_history: BoundedHistory = Field(
+        default_factory=lambda: BoundedHistory(
+            "conversation", count_key=HISTORY_COUNT_KEYS["conversation"]
+        )
+    )
+    reasoning_history: BoundedHistory = Field(
+        default_factory=lambda: BoundedHistory(
+            "reasoning", count_key=HISTORY_COUNT_KEYS["reasoning"]
+        )
+    )
+
+    # Rolling summary of exchanges older than the recent turns
+    # (utils.conversation_memory): one line per exchange, with the oldest
+    # collapsed into per-action counts
+    summary_lines: List[str] = []
+    summary_counts: Dict[str, int] = {}
+    summarized_turns: int = 0
+
+    @field_validator("conversation_history", "reasoning_history", mode="before")
+    @classmethod
+    def _as_bounded_history(cls, value, info):
+        if isinstance(value, BoundedHistory):
+            return value
+        name = info.field_name.replace("_history", "")
+        return BoundedHistory.from_saved(name, value, HISTORY_COUNT_KEYS[name])
@@ -1,9 +1,17 @@
-from typing import Dict
+from typing import Dict, List
 
-from pydantic import BaseModel
+from state.tracked_state import TrackedState
 
 
-class EvaluationState(BaseModel):
+class EvaluationState(TrackedState):
     criteria: Dict[str, float] = {}
     scores: Dict[str, float] = {}
     final_score: float = 0.0
+
+    # Unweighted per-criterion scores and the fields each criterion matched,
+    # kept so criteria changes only match what was added
+    raw_scores: Dict[str, float] = {}
+    matched_fields: Dict[str, List[str]] = {}
+    # Mapping config (utils.mapping_config fingerprint) those were matched
+    # under; a different one means they must be matched again
+    mapping_fingerprint: str = ""
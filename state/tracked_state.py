@@ -0,0 +1,45 @@
+import itertools
+from typing import Dict
+
+from pydantic import BaseModel, PrivateAttr
+
+# One clock for every model, so a replaced sub-state (e.g. after "clear")
+# never reuses a version its predecessor had
+_clock = itertools.count(1)
+
+
+class TrackedState(BaseModel):
+    """
+    Base for sub-states that record when each field was last modified.
+
+    Assigning a field stamps it with a new version; code that mutates a
+    field in place (dict.update, list.append) calls touch() with its name.
+    StateManager compares versions to skip unchanged fields and sub-states
+    without serializing them.
+    """
+
+    _field_versions: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _version: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context):
+        self.touch(*type(self).model_fields)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self.touch(name)
+
+    def touch(self, *fields):
+        """Mark fields as modified."""
+        version = next(_clock)
+        for field in fields:
+            self._field_versions[field] = version
+        self._version = version
+
+    @property
+    def version(self):
+        """Version of the most recent modification to any field."""
+        return self._version
+
+    def field_version(self, field):
+        return self._field_versions.get(field, 0)
@@ -0,0 +1,160 @@
+import bisect
+import math
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from utils.text_index import tokenize
+
+# Okapi BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# A line's score also counts its section's score at this weight, so
+# "coursework" questions reach the lines under "Major Coursework Highlights:"
+SECTION_WEIGHT = 0.5
+
+# Query terms of at least this length also match longer words they prefix
+# (course -> coursework), at a discount
+PREFIX_MIN_LENGTH = 4
+PREFIX_WEIGHT = 0.7
+
+# Question words that say nothing about what is being looked for
+STOPWORDS = frozenset("""
+    a about an and any anything are as at be been by can could did do does
+    for from had has have he her him his how i in is it its me my of on or
+    our she should show tell that the their them there they this to was we
+    were what when where which who whom why will with would you your
+    take took get got any some
+    """.split())
+
+# Words every question about the document shares; they would otherwise
+# match the certificate's title lines ("Certificate of Degree")
+DOMAIN_STOPWORDS = frozenset("""
+    certificate certificates cert document student degree diploma
+    """.split())
+
+
+def query_terms(text):
+    return [
+        token
+        for token in tokenize(text)
+        if token not in STOPWORDS and token not in DOMAIN_STOPWORDS
+    ]
+
+
+class _BM25Corpus:
+    """BM25 statistics over a list of token lists."""
+
+    def __init__(self, documents):
+        self.postings = defaultdict(dict)
+        self.lengths = [len(tokens) for tokens in documents]
+        for doc, tokens in enumerate(documents):
+            for term, count in Counter(tokens).items():
+                self.postings[term][doc] = count
+        self.average_length = (
+            sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        )
+        self.terms = sorted(self.postings)
+
+    def _idf(self, term):
+        df = len(self.postings.get(term, ()))
+        n = len(self.lengths)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def expand(self, term):
+        """(matching term, weight) pairs: the term itself plus prefix matches."""
+        matches = {term: 1.0} if term in self.postings else {}
+        # Plurals in questions ("courses") should still reach "coursework"
+        stem = term[:-1] if term.endswith("s") else term
+        if len(stem) >= PREFIX_MIN_LENGTH:
+            i = bisect.bisect_left(self.terms, stem)
+            while i < len(self.terms) and self.terms[i].startswith(stem):
+                matches.setdefault(self.terms[i], PREFIX_WEIGHT)
+                i += 1
+        return matches.items()
+
+    def scores(self, terms):
+        """Dict of document -> BM25 score for the query terms."""
+        scores = defaultdict(float)
+        for query_term in terms:
+            for term, weight in self.expand(query_term):
+                idf = self._idf(term) * weight
+                for doc, tf in self.postings[term].items():
+                    norm = K1 * (1 - B + B * self.lengths[doc] / self.average_length)
+                    scores[doc] += idf * tf * (K1 + 1) / (tf + norm)
+        return scores
+
+
+def _is_heading(line):
+    stripped = line.strip()
+    return stripped.endswith(":") or (stripped.isupper() and len(stripped) > 3)
+
+
+class BM25Retriever:
+    """
+    BM25 over the lines of one certificate, with section context.
+
+    Each non-empty line is a document, and so is each section (a heading
+    such as "Research Experience:" plus the lines under it). A line's score
+    is its own BM25 score plus SECTION_WEIGHT times its section's.
+    """
+
+    def __init__(self, raw_text):
+        self.lines = []
+        self.sections = []
+        line_sections = []
+        section_tokens = []
+
+        for line in raw_text.splitlines():
+            if not line.strip():
+                continue
+            if _is_heading(line):
+                self.sections.append(line.strip().rstrip(":"))
+                section_tokens.append([])
+            elif not self.sections:
+                self.sections.append("")
+                section_tokens.append([])
+            section_tokens[-1].extend(tokenize(line))
+            self.lines.append(line.strip())
+            line_sections.append(len(self.sections) - 1)
+
+        self.line_sections = line_sections
+        self._section_lines = defaultdict(list)
+        for line, section in zip(self.lines, line_sections):
+            self._section_lines[self.sections[section]].append(line)
+        self._lines = _BM25Corpus([tokenize(line) for line in self.lines])
+        self._sections = _BM25Corpus(section_tokens)
+
+    def search(self, query, k=3, min_score=0.0):
+        """
+        Top matching lines for a question.
+
+        Returns:
+            List of (score, line, section) sorted by score, highest first
+        """
+        terms = query_terms(query)
+        if not terms or not self.lines:
+            return []
+        line_scores = self._lines.scores(terms)
+        section_scores = self._sections.scores(terms)
+
+        results = []
+        for i, section in enumerate(self.line_sections):
+            score = line_scores.get(i, 0.0)
+            if not score:
+                continue
+            score += SECTION_WEIGHT * section_scores.get(section, 0.0)
+            if score > min_score:
+                results.append((score, self.lines[i], self.sections[section]))
+        results.sort(key=lambda result: result[0], reverse=True)
+        return results[:k]
+
+    def section_lines(self, section):
+        """Lines of a section (heading included) in certificate order."""
+        return list(self._section_lines.get(section, ()))
+
+
+@lru_cache(maxsize=32)
+def certificate_retriever(raw_text):
+    """BM25 retriever for a certificate, built once per text."""
+    return BM25Retriever(raw_text)
@@ -0,0 +1,342 @@
+import json
+import uuid
+from array import array
+from collections import deque
+from itertools import islice
+from pathlib import Path
+
+# Append-only segments for history entries that left the in-memory window,
+# for histories not given a spill_dir (StateManager gives each session one)
+SPILL_DIR = Path("session_data") / "history_spill"
+
+# Entries kept in memory; once the window is SPILL_BATCH over this, the
+# oldest entries are written out together
+WINDOW_SIZE = 200
+SPILL_BATCH = 50
+
+
+def saved_history_length(data):
+    """Entry count of a saved history, in either the windowed or list format."""
+    if isinstance(data, list):
+        return len(data)
+    return data.get("spilled", 0) + len(data.get("window", []))
+
+
+class BoundedHistory:
+    """
+    List-like history that keeps only the newest entries in memory.
+
+    Older entries are appended to a JSONL segment as [position, entry]
+    lines and paged back in on demand, so len(), indexing (negative too),
+    slicing and iteration behave like the full list while memory and save
+    size stay flat. Reads of recent entries ([-1], [-2:]) never touch disk.
+
+    With a count_key, counts of that entry field (e.g. each action) are kept
+    up to date on append, so stats never need a pass over the history.
+
+    A deferred history (see deferred()) knows only its length and counts
+    until something reads its entries; appends are buffered until then.
+    Reads of recent entries and to_saved() are served from the saved form
+    plus the buffered appends, so only reads of spilled entries load it.
+    """
+
+    def __init__(
+        self,
+        name="history",
+        entries=(),
+        window_size=WINDOW_SIZE,
+        spill_path=None,
+        spilled=0,
+        count_key=None,
+        spill_dir=None,
+    ):
+        self.name = name
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.window_size = window_size
+        self.count_key = count_key
+        self._counts = {}
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.spilled = spilled
+        self._window = deque()
+        # Byte offset of each spilled entry; rebuilt from the segment when
+        # restored from a save
+        self._offsets = None if spilled else array("q")
+        # Set while deferred: loads the saved form, plus entries appended
+        # since and the length they add up to
+        self._load = None
+        self._loaded = None
+        self._pending = []
+        self._length = 0
+        self.extend(entries)
+
+    @classmethod
+    def from_saved(cls, name, data, count_key=None):
+        """
+        Rebuild from to_saved() output or a plain list from older saves.
+        A BoundedHistory (e.g. a deferred one) is returned as is.
+        """
+        if isinstance(data, BoundedHistory):
+            data.count_key = data.count_key or count_key
+            return data
+        if isinstance(data, list):
+            return cls(name, data, count_key=count_key)
+        history = cls(name, count_key=count_key)
+        history._restore(data)
+        # Saves without counts get them recounted on first use
+        history._counts = data.get("counts") if count_key else {}
+        return history
+
+    @classmethod
+    def deferred(cls, name, length, load, counts=None, count_key=None):
+        """
+        A history whose entries are loaded on first read.
+
+        Args:
+            length: Number of entries in the saved history
+            load: Callable returning the saved form (to_saved() output or a list)
+            counts: Saved counts, so counts() doesn't force the load
+        """
+        history = cls(name, count_key=count_key)
+        history._load = load
+        history._length = length
+        history._counts = dict(counts) if counts is not None else None
+        return history
+
+    def _restore(self, data):
+        self.spill_path = Path(data["spill_path"]) if data.get("spill_path") else None
+        self.spilled = data.get("spilled", 0)
+        self._offsets = None if self.spilled else array("q")
+        self._window.extend(data.get("window", []))
+
+    def _saved_form(self):
+        """A deferred history's saved form, read once."""
+        if self._loaded is None:
+            try:
+                self._loaded = self._load()
+            except Exception as e:
+                print(f"⚠️ Failed to load {self.name} history: {e}")
+                self._loaded = []
+        return self._loaded
+
+    def _saved_window(self):
+        """(position of the first entry, entries) the saved form holds in memory."""
+        data = self._saved_form()
+        if isinstance(data, list):
+            return 0, data
+        return data.get("spilled", 0), data.get("window", [])
+
+    def _materialize(self):
+        """Load a deferred history's saved entries and apply buffered appends."""
+        if self._load is None:
+            return
+        data = self._saved_form()
+        self._load, self._loaded = None, None
+        if isinstance(data, list):
+            self._window.extend(data)
+        else:
+            self._restore(data)
+            if self._counts is None and self.count_key:
+                self._counts = data.get("counts")
+        pending, self._pending = self._pending, []
+        for entry in pending:
+            self._push(entry)
+
+    def to_saved(self):
+        """In-memory window plus what's needed to find the spilled entries."""
+        if self._load is not None:
+            # Saved form plus the appends since, without loading the history
+            data = self._saved_form()
+            spilled, window = self._saved_window()
+            spill_path = None if isinstance(data, list) else data.get("spill_path")
+            return {
+                "window": window + self._pending,
+                "spill_path": spill_path,
+                "spilled": spilled,
+                "counts": self.counts(),
+            }
+        return {
+            "window": list(self._window),
+            "spill_path": str(self.spill_path) if self.spill_path else None,
+            "spilled": self.spilled,
+            "counts": self.counts(),
+        }
+
+    def counts(self):
+        """Entries per value of count_key, e.g. {"rescore": 3, ...}."""
+        if self._counts is None:
+            self._materialize()
+        if self._counts is None:
+            self._counts = {}
+            for entry in self:
+                self._count(entry)
+        return dict(self._counts)
+
+    def _count(self, entry):
+        if self.count_key:
+            value = entry.get(self.count_key) or "unknown"
+            self._counts[value] = self._counts.get(value, 0) + 1
+
+    def append(self, entry):
+        if self._counts is not None:
+            self._count(entry)
+        if self._load is None:
+            self._push(entry)
+            return
+        self._pending.append(entry)
+        self._length += 1
+        if len(self._pending) > self.window_size + SPILL_BATCH:
+            self._materialize()
+
+    def _push(self, entry):
+        self._window.append(entry)
+        if len(self._window) > self.window_size + SPILL_BATCH:
+            self._spill(len(self._window) - self.window_size)
+
+    def extend(self, entries, counts=None):
+        """
+        Append entries; counts, when given, are the running counts after
+        them (e.g. from a journal record) and replace the kept ones.
+        """
+        for entry in entries:
+            self.append(entry)
+        if counts is not None:
+            self._counts = dict(counts)
+
+    def window(self):
+        """Entries currently held in memory, oldest first."""
+        self._materialize()
+        return list(self._window)
+
+    def _spill(self, count):
+        if self.spill_path is None:
+            spill_dir = self.spill_dir or SPILL_DIR
+            spill_dir.mkdir(parents=True, exist_ok=True)
+            self.spill_path = spill_dir / f"{self.name}_{uuid.uuid4().hex}.jsonl"
+        self._ensure_offsets()
+        with open(self.spill_path, "ab") as f:
+            for _ in range(count):
+                entry = self._window.popleft()
+                self._offsets.append(f.tell())
+                f.write(json.dumps([self.spilled, entry]).encode() + b"\n")
+                self.spilled += 1
+
+    def _ensure_offsets(self):
+        """
+        Index the segment after a restore. Lines past the saved count (spilled
+        after that save) are ignored; they repeat entries still in the window.
+        """
+        if self._offsets is not None:
+            return
+        offsets = array("q", [-1] * self.spilled)
+        try:
+            with open(self.spill_path, "rb") as f:
+                position = 0
+                for line in f:
+                    i = int(line[1 : line.index(b",")])
+                    if i < self.spilled and offsets[i] < 0:
+                        offsets[i] = position
+                    position += len(line)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ History segment unreadable ({e}); older entries unavailable")
+        self._offsets = offsets
+
+    def _read_spilled(self, start, stop):
+        """Spilled entries start..stop-1; entries that can't be read come back {}."""
+        if start >= stop:
+            return []
+        self._ensure_offsets()
+        entries = []
+        try:
+            with open(self.spill_path, "rb") as f:
+                for i in range(start, stop):
+                    offset = self._offsets[i]
+                    if offset < 0:
+                        entries.append({})
+                        continue
+                    if f.tell() != offset:
+                        f.seek(offset)
+                    entries.append(json.loads(f.readline())[1])
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ Failed to read history segment: {e}")
+            entries.extend({} for _ in range(stop - start - len(entries)))
+        return entries
+
+    def __len__(self):
+        if self._load is not None:
+            return self._length
+        return self.spilled + len(self._window)
+
+    def __getitem__(self, key):
+        if self._load is not None:
+            # Entries appended since a deferred restore, and the saved
+            # window before them, are at hand
+            if isinstance(key, slice):
+                start, stop, step = key.indices(len(self))
+                entries = (
+                    self._deferred_slice(start, max(stop, start)) if step > 0 else None
+                )
+                if entries is not None:
+                    return entries[::step]
+            else:
+                index = key + len(self) if key < 0 else key
+                if 0 <= index < len(self):
+                    entries = self._deferred_slice(index, index + 1)
+                    if entries is not None:
+                        return entries[0]
+            self._materialize()
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if stop <= start:
+                return []
+            head = self._read_spilled(start, min(stop, self.spilled))
+            tail = islice(
+                self._window,
+                max(start - self.spilled, 0),
+                max(stop - self.spilled, 0),
+            )
+            return head + list(tail)
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("history index out of range")
+        if key >= self.spilled:
+            return self._window[key - self.spilled]
+        return self._read_spilled(key, key + 1)[0]
+
+    def _deferred_slice(self, start, stop):
+        """
+        Entries start..stop-1 of a deferred history from the buffered appends
+        and the saved window, or None if some of them are spilled.
+        """
+        base = self._length - len(self._pending)
+        if start >= base:
+            return self._pending[start - base : stop - base]
+        first, window = self._saved_window()
+        if start < first:
+            return None
+        return (
+            window[start - first : stop - first] + self._pending[: max(stop - base, 0)]
+        )
+
+    def __iter__(self):
+        # Page the segment in chunks so a full pass never holds it all
+        self._materialize()
+        for start in range(0, self.spilled, SPILL_BATCH):
+            yield from self._read_spilled(start, min(start + SPILL_BATCH, self.spilled))
+        yield from list(self._window)
+
+    def __eq__(self, other):
+        if isinstance(other, (BoundedHistory, list)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        if self._load is not None:
+            return f"BoundedHistory({self.name!r}, {len(self)} entries, deferred)"
+        return (
+            f"BoundedHistory({self.name!r}, {len(self)} entries, "
+            f"{self.spilled} spilled)"
+        )
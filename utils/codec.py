@@ -0,0 +1,104 @@
+"""
+Pluggable encoding for persisted session state.
+
+A codec is a format plus optional compression, named like "json",
+"orjson" or "msgpack+gzip". orjson, msgpack and zstandard are optional
+extras, so DEFAULT_CODEC is stdlib json: state saved with it can be read
+on any install. Each saved row records its codec. Every codec reads and
+writes plain dicts/lists/str/float/int/bool/None, which is all the state
+models hold once histories are in their saved form.
+"""
+
+import gzip
+import json
+
+FORMATS = ("json", "orjson", "msgpack")
+COMPRESSIONS = (None, "gzip", "zstd")
+
+
+def compress(data, compression):
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor().compress(data)
+    return data
+
+
+def decompress(data, compression):
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def _installed(module):
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def available_codecs():
+    """Names of every format/compression pair usable here."""
+    formats = [f for f in FORMATS if f == "json" or _installed(f)]
+    compressions = [c for c in COMPRESSIONS if c != "zstd" or _installed("zstandard")]
+    return [f if c is None else f"{f}+{c}" for f in formats for c in compressions]
+
+
+class Codec:
+    """Encodes state objects to bytes and back."""
+
+    def __init__(self, format="json", compression=None):
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported state format: {format}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported state compression: {compression}")
+        self.format = format
+        self.compression = compression
+
+        if format == "orjson":
+            import orjson
+
+            self._dumps, self._loads = orjson.dumps, orjson.loads
+        elif format == "msgpack":
+            import msgpack
+
+            self._dumps = msgpack.packb
+            self._loads = lambda data: msgpack.unpackb(data, strict_map_key=False)
+        else:
+            self._dumps = lambda obj: json.dumps(
+                obj, separators=(",", ":"), ensure_ascii=False
+            ).encode()
+            self._loads = json.loads
+
+    @property
+    def name(self):
+        if self.compression is None:
+            return self.format
+        return f"{self.format}+{self.compression}"
+
+    def encode(self, obj):
+        return compress(self._dumps(obj), self.compression)
+
+    def decode(self, data):
+        return self._loads(decompress(data, self.compression))
+
+
+_codecs = {}
+
+
+def get_codec(name):
+    """Shared Codec for a name such as "msgpack+gzip"."""
+    if name not in _codecs:
+        format, _, compression = name.partition("+")
+        _codecs[name] = Codec(format, compression or None)
+    return _codecs[name]
+
+
+DEFAULT_CODEC = "json"
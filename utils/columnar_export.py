@@ -0,0 +1,299 @@
+"""
+Columnar export of evaluations for bulk analytics.
+
+Each evaluation record (extracted fields, confidence, criteria, scores and
+final score) is flattened into columns such as ``field.Name``,
+``confidence.Name``, ``criterion.GPA``, ``score.GPA`` and ``final_score``.
+
+Two formats are supported:
+
+- ``npy`` (default): a directory with ``schema.json`` and one ``.npy`` file
+  per column per chunk. Strings use fixed-width unicode and missing numbers
+  are NaN, so every column can be memory-mapped with ``np.load(mmap_mode="r")``.
+- ``parquet``: one Parquet file written in row groups, when pyarrow is
+  installed. Dict-valued inputs become map columns.
+
+Usage:
+    python -m utils.columnar_export session_data exports/evaluations
+    python -m utils.columnar_export session_data exports/history npy <session_id>
+
+The first form exports every session's current state; with a session ID
+the session's kept snapshots are exported instead, one row per snapshot.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from utils.session_store import SessionStore
+from utils.snapshot_store import SnapshotStore
+from utils.state_manager import session_dir
+
+SCHEMA_FILE = "schema.json"
+PARQUET_FILE = "evaluations.parquet"
+
+# Dict-valued record keys and the column prefix / kind they flatten into
+DICT_COLUMNS = {
+    "extracted_fields": ("field", "str"),
+    "confidence": ("confidence", "float"),
+    "criteria": ("criterion", "float"),
+    "scores": ("score", "float"),
+}
+SCALAR_COLUMNS = {
+    "evaluation_id": "str",
+    "timestamp": "str",
+    "final_score": "float",
+}
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def flatten_record(record):
+    """Flatten one evaluation record into {column: (kind, value)}."""
+    row = {
+        name: (kind, record.get(name, "" if kind == "str" else np.nan))
+        for name, kind in SCALAR_COLUMNS.items()
+    }
+    for key, (prefix, kind) in DICT_COLUMNS.items():
+        for name, value in (record.get(key) or {}).items():
+            row[f"{prefix}.{name}"] = (kind, value)
+    return row
+
+
+class ColumnarWriter:
+    """
+    Streams evaluation records to disk in fixed-size chunks.
+
+    Only the current chunk is held in memory, so exporting millions of
+    evaluations never materialises them all as Python dicts.
+    """
+
+    def __init__(self, out_dir, chunk_size=10_000, format="npy"):
+        if format not in ("npy", "parquet"):
+            raise ValueError(f"Unsupported columnar format: {format}")
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.format = format
+        self.rows_written = 0
+        self._rows = []
+        self._schema = {"format": format, "columns": {}, "chunks": []}
+        self._parquet_writer = None
+
+    def append(self, record):
+        self._rows.append(flatten_record(record))
+        if len(self._rows) >= self.chunk_size:
+            self.flush()
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def flush(self):
+        if not self._rows:
+            return
+        if self.format == "parquet":
+            self._flush_parquet()
+        else:
+            self._flush_npy()
+        self.rows_written += len(self._rows)
+        self._rows = []
+
+    def _flush_npy(self):
+        chunk_name = f"chunk_{len(self._schema['chunks']):05d}"
+        chunk_dir = self.out_dir / chunk_name
+        chunk_dir.mkdir(exist_ok=True)
+
+        kinds = {}
+        for row in self._rows:
+            for column, (kind, _) in row.items():
+                kinds.setdefault(column, kind)
+
+        columns = self._schema["columns"]
+        for column, kind in kinds.items():
+            if column not in columns:
+                columns[column] = {"kind": kind, "file": f"c{len(columns):05d}.npy"}
+            if kind == "str":
+                values = np.array(
+                    [str(row.get(column, ("", ""))[1]) for row in self._rows]
+                )
+            else:
+                values = np.array(
+                    [_as_float(row.get(column, ("", np.nan))[1]) for row in self._rows],
+                    dtype=np.float64,
+                )
+            np.save(chunk_dir / columns[column]["file"], values)
+
+        self._schema["chunks"].append({"name": chunk_name, "rows": len(self._rows)})
+        self._write_schema()
+
+    def _flush_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        records = {name: [] for name in list(SCALAR_COLUMNS) + list(DICT_COLUMNS)}
+        for row in self._rows:
+            maps = {key: [] for key in DICT_COLUMNS}
+            for column, (kind, value) in row.items():
+                if column in SCALAR_COLUMNS:
+                    records[column].append(
+                        str(value) if kind == "str" else _as_float(value)
+                    )
+                    continue
+                prefix, name = column.split(".", 1)
+                for key, (key_prefix, _) in DICT_COLUMNS.items():
+                    if key_prefix == prefix:
+                        maps[key].append(
+                            (name, str(value) if kind == "str" else _as_float(value))
+                        )
+            for key, items in maps.items():
+                records[key].append(items)
+
+        schema = pa.schema(
+            [
+                ("evaluation_id", pa.string()),
+                ("timestamp", pa.string()),
+                ("final_score", pa.float64()),
+                ("extracted_fields", pa.map_(pa.string(), pa.string())),
+                ("confidence", pa.map_(pa.string(), pa.float64())),
+                ("criteria", pa.map_(pa.string(), pa.float64())),
+                ("scores", pa.map_(pa.string(), pa.float64())),
+            ]
+        )
+        table = pa.table(records, schema=schema)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.out_dir / PARQUET_FILE, schema)
+        self._parquet_writer.write_table(table)
+
+    def _write_schema(self):
+        tmp_file = self.out_dir / (SCHEMA_FILE + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(self._schema, f, indent=2)
+        tmp_file.replace(self.out_dir / SCHEMA_FILE)
+
+    def close(self):
+        self.flush()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ColumnarReader:
+    """
+    Memory-mapped reader for directories written by ColumnarWriter (npy format).
+    """
+
+    def __init__(self, out_dir):
+        self.out_dir = Path(out_dir)
+        with open(self.out_dir / SCHEMA_FILE, "r") as f:
+            self.schema = json.load(f)
+
+    @property
+    def columns(self):
+        return list(self.schema["columns"])
+
+    @property
+    def num_rows(self):
+        return sum(chunk["rows"] for chunk in self.schema["chunks"])
+
+    def iter_chunks(self, column):
+        """
+        Yield one array per chunk without copying: memory-mapped when the
+        chunk has the column, a NaN / empty-string filler otherwise.
+        """
+        info = self.schema["columns"][column]
+        for chunk in self.schema["chunks"]:
+            path = self.out_dir / chunk["name"] / info["file"]
+            if path.exists():
+                yield np.load(path, mmap_mode="r")
+            elif info["kind"] == "str":
+                yield np.full(chunk["rows"], "")
+            else:
+                yield np.full(chunk["rows"], np.nan)
+
+    def read_column(self, column):
+        """Concatenate a column across chunks into one array."""
+        return np.concatenate(list(self.iter_chunks(column)))
+
+
+def _evaluation_record(evaluation_id, data):
+    certificate = data.get("certificate", {})
+    evaluation = data.get("evaluation", {})
+    return {
+        "evaluation_id": evaluation_id,
+        "timestamp": data.get("timestamp", ""),
+        "extracted_fields": certificate.get("extracted_fields", {}),
+        "confidence": certificate.get("confidence", {}),
+        "criteria": evaluation.get("criteria", {}),
+        "scores": evaluation.get("scores", {}),
+        "final_score": evaluation.get("final_score", 0.0),
+    }
+
+
+def iter_session_records(state_dir="session_data"):
+    """
+    Stream one evaluation record per session in the session database, as
+    of its last save (snapshot plus replayed journal). Histories aren't read.
+    """
+    db_path = Path(state_dir) / "sessions.db"
+    if not db_path.exists():
+        return
+    store = SessionStore(db_path)
+    for session_id in store.list_sessions():
+        session = store.read_session(session_id, histories=False)
+        if session is not None:
+            yield _evaluation_record(session_id, session[0])
+
+
+def iter_snapshot_records(state_dir, session_id):
+    """
+    Stream one evaluation record per kept snapshot of a session, oldest
+    first, resolving delta snapshots and blob references.
+    """
+    history_dir = session_dir(Path(state_dir) / "history", session_id)
+    if not history_dir.is_dir():
+        return
+    for name, data in SnapshotStore(history_dir).iter_snapshots():
+        yield _evaluation_record(name.split(".")[0], data)
+
+
+def export_sessions(
+    state_dir, out_dir, chunk_size=10_000, format="npy", session_id=None
+):
+    """
+    Export every saved session in state_dir, or with a session_id that
+    session's kept snapshots; returns rows written.
+    """
+    if session_id is None:
+        records = iter_session_records(state_dir)
+    else:
+        records = iter_snapshot_records(state_dir, session_id)
+    with ColumnarWriter(out_dir, chunk_size=chunk_size, format=format) as writer:
+        writer.extend(records)
+    return writer.rows_written
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(
+            "Usage: python -m utils.columnar_export <state_dir> <out_dir> "
+            "[npy|parquet] [session_id]"
+        )
+        sys.exit(1)
+    fmt = sys.argv[3] if len(sys.argv) > 3 else "npy"
+    session_id = sys.argv[4] if len(sys.argv) > 4 else None
+    rows = export_sessions(sys.argv[1], sys.argv[2], format=fmt, session_id=session_id)
+    print(f"✓ Exported {rows} evaluations to {sys.argv[2]}")
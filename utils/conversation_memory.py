@@ -0,0 +1,142 @@
+"""
+Compact conversation context for the decision prompt.
+
+Older exchanges are folded, one line each, into a rolling summary kept on
+ConversationState; when the summary outgrows its budget the oldest lines
+collapse into per-action counts. The newest RECENT_TURNS exchanges are
+included verbatim but truncated, so the context stays under
+CONTEXT_TOKEN_BUDGET no matter how long the session or the agent replies.
+"""
+
+import math
+import re
+
+from utils import metrics
+
+# Rough token estimate; close enough for budgeting English prompts
+CHARS_PER_TOKEN = 4
+
+CONTEXT_TOKEN_BUDGET = 400
+SUMMARY_TOKEN_BUDGET = 200
+RECENT_TURNS = 2
+
+# Per-side truncation of the recent turns, shrunk further if over budget
+RECENT_USER_CHARS = 200
+RECENT_AGENT_CHARS = 300
+MIN_RECENT_CHARS = 40
+
+SUMMARY_USER_CHARS = 60
+SUMMARY_AGENT_CHARS = 60
+
+SUMMARY_LINE_RE = re.compile(r"^- \[([^\]]*)\]")
+MARKDOWN_RE = re.compile(r"[*_`#>|]+|^[-=•\s]+$")
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _clip(text, limit):
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
+
+def _headline(message):
+    """First line of an agent message with content, markdown stripped."""
+    for line in message.splitlines():
+        line = MARKDOWN_RE.sub("", line).strip()
+        if line:
+            return line
+    return ""
+
+
+def summary_line(exchange):
+    action = exchange.get("action", "unknown")
+    user = _clip(exchange.get("user", ""), SUMMARY_USER_CHARS)
+    agent = _clip(_headline(exchange.get("agent", "")), SUMMARY_AGENT_CHARS)
+    return f'- [{action}] "{user}" → {agent}'
+
+
+def update_summary(conversation):
+    """
+    Fold exchanges that left the recent window into the rolling summary.
+
+    Only exchanges added since the last call are read, so a turn costs one
+    or two lines of work however long the history is.
+    """
+    history = conversation.conversation_history
+    fold_until = len(history) - RECENT_TURNS
+    if fold_until <= conversation.summarized_turns:
+        return
+
+    lines = conversation.summary_lines
+    for exchange in history[conversation.summarized_turns : fold_until]:
+        lines.append(summary_line(exchange))
+    conversation.summarized_turns = fold_until
+
+    # Oldest lines give way to counts once the summary is over budget
+    while lines and estimate_tokens("\n".join(lines)) > SUMMARY_TOKEN_BUDGET:
+        match = SUMMARY_LINE_RE.match(lines.pop(0))
+        action = match.group(1) if match else "unknown"
+        conversation.summary_counts[action] = (
+            conversation.summary_counts.get(action, 0) + 1
+        )
+    conversation.touch("summary_lines", "summary_counts")
+
+
+def _format_recent(exchanges, user_chars, agent_chars):
+    return "\n".join(
+        f"  User: {_clip(exchange.get('user', ''), user_chars)}\n"
+        f"  Agent ({exchange.get('action', 'unknown')}): "
+        f"{_clip(exchange.get('agent', ''), agent_chars)}"
+        for exchange in exchanges
+    )
+
+
+def build_context(conversation):
+    """
+    Summary plus truncated recent turns, within CONTEXT_TOKEN_BUDGET.
+
+    Returns:
+        The context block for the decision prompt
+    """
+    update_summary(conversation)
+    history = conversation.conversation_history
+    if not len(history):
+        return "NO HISTORY"
+
+    parts = []
+    if conversation.summary_counts:
+        earlier = sum(conversation.summary_counts.values())
+        counts = ", ".join(
+            f"{action}×{count}"
+            for action, count in sorted(
+                conversation.summary_counts.items(), key=lambda x: x[1], reverse=True
+            )
+        )
+        parts.append(f"Earlier ({earlier} turns): {counts}")
+    if conversation.summary_lines:
+        parts.append("\n".join(conversation.summary_lines))
+    header = "Summary of earlier turns:\n" + "\n".join(parts) + "\n" if parts else ""
+
+    recent_turns = history[-RECENT_TURNS:]
+    user_chars, agent_chars = RECENT_USER_CHARS, RECENT_AGENT_CHARS
+    context = header + "Most recent turns:\n"
+    context += _format_recent(recent_turns, user_chars, agent_chars)
+    while (
+        estimate_tokens(context) > CONTEXT_TOKEN_BUDGET
+        and agent_chars > MIN_RECENT_CHARS
+    ):
+        user_chars = max(user_chars // 2, MIN_RECENT_CHARS)
+        agent_chars = max(agent_chars // 2, MIN_RECENT_CHARS)
+        context = header + "Most recent turns:\n"
+        context += _format_recent(recent_turns, user_chars, agent_chars)
+
+    metrics.observe("prompt.context_tokens", estimate_tokens(context))
+    return context
+
+
+def record_prompt_size(prompt):
+    """Per-turn prompt-size samples for the session stats."""
+    metrics.observe("prompt.chars", len(prompt))
+    metrics.observe("prompt.tokens", estimate_tokens(prompt))
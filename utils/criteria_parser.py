@@ -0,0 +1,327 @@
+"""
+Deterministic parser for criteria messages, tried before the LLM.
+
+Understands:
+  - explicit weights:  "GPA 40%, Research 30%, Leadership 30%",
+                       "40% GPA and 60% research", "GPA: 0.5, Honors: 0.5"
+  - ratios:            "GPA, Research and Leadership 2:1:1", "GPA:Research = 3:1"
+  - equal-weight lists: "evaluate based on GPA, Institution, and Degree"
+  - changes:           "change GPA to 50%" (others rescaled proportionally),
+                       "remove Leadership"
+
+Relative changes ("increase GPA by 10%"), weights above 100% and a lone
+"prioritize GPA" are ambiguous and always go to the LLM.
+
+Weights are normalised to sum to 1.0 and criterion names are resolved to
+their canonical form through the synonyms in config/mappings.json. New
+criterion names are only accepted after an explicit preamble ("evaluate
+based on ...", "set criteria to ..."); otherwise every name must be a
+configured criterion or one already active, so ordinary sentences aren't
+mistaken for criteria. Anything it isn't sure about returns None so the
+caller can ask the LLM.
+"""
+
+import re
+
+from utils.mapping_config import get_mapping_index
+from utils.weight_sweep import reweight
+
+NUMBER = r"(\d+(?:\.\d+)?)\s*(%|percent\b)?"
+
+PREAMBLE_RE = re.compile(
+    r"^(?:please\s+|can you\s+|could you\s+|i want to\s+|let's\s+)*"
+    r"(?:"
+    r"(?:set|use|make|update|change)\s+(?:the\s+)?(?:evaluation\s+)?"
+    r"(?:criteria|criterion|weights?)(?!\s+(?:of|for|on)\b)\s*(?:to\s+be|to|as|=|:)?"
+    r"|(?:evaluate|score|rank|judge|assess|grade)(?:\s+(?:it|this|the certificate))?"
+    r"\s+(?:based\s+on|on|by|using|with)"
+    r"|based\s+on"
+    r"|(?:the\s+)?(?:criteria|weights?)\s*(?:are|is|=|:)"
+    r"|prioriti[sz]e"
+    r")\s*(?:(?:prioriti[sz]e|focus\s+on|emphasi[sz]e)\s+)?",
+    re.I,
+)
+CHANGE_RE = re.compile(
+    r"^(?:please\s+)?(change|set|make|update|adjust|increase|decrease|raise|lower|"
+    r"add)\s+(.+)$",
+    re.I,
+)
+# Verbs that only say which way a weight moves; without "to N" the amount
+# could be absolute or relative
+RELATIVE_VERBS = {"increase", "decrease", "raise", "lower"}
+RELATIVE_AMOUNT_RE = re.compile(r"\bby\s+" + NUMBER, re.I)
+PRIORITIZE_RE = re.compile(r"prioriti[sz]e|focus\s+on|emphasi[sz]e", re.I)
+CHANGE_ITEM_RE = re.compile(
+    r"^(?:the\s+)?(?:weight\s+(?:of|for|on)\s+)?(.+?)(?:'s)?(?:\s+weight)?"
+    r"\s*(?:(?:to|=|at|:|with)\s*)?" + NUMBER + r"(?:\s+weight)?$",
+    re.I,
+)
+REMOVE_RE = re.compile(
+    r"^(?:please\s+)?(?:remove|drop|delete|exclude|ignore)\s+(?:the\s+)?"
+    r"(?:criteri(?:on|a)\s+)?(.+)$",
+    re.I,
+)
+NUMBER_SPLIT_RE = re.compile(r"\d+(?:\.\d+)?\s*(?:%|percent\b)?", re.I)
+RATIO_RE = re.compile(r"(\d+(?:\.\d+)?(?:\s*:\s*\d+(?:\.\d+)?)+)")
+SPLIT_RE = re.compile(r"\s*(?:,|;|/|\n|&|\+|\band\b|\bplus\b)\s*", re.I)
+
+# Words that signal a sentence rather than a list of criteria
+NOT_A_LIST_RE = re.compile(
+    r"\b(what|why|how|which|who|if|would|should|above|below|over|under|least|"
+    r"minimum|maximum|more than|less than|score my|show|explain)\b|[<>?]",
+    re.I,
+)
+FILLER_RE = re.compile(
+    r"^(?:(?:use|give|assign|the|a|an|for|of|on|at|to|is|be|with|"
+    r"weight(?:ed|ing)?|by)\s+)+"
+    r"|(?:\s+(?:weight(?:ed|ing)?|each|equally|criteri(?:on|a)|please|to|at|for))+$",
+    re.I,
+)
+NAME_RE = re.compile(r"^[A-Za-z][\w'’. /&()-]{0,39}$")
+MAX_NAME_WORDS = 5
+
+
+def _clean_name(text):
+    name = FILLER_RE.sub("", text.strip(" \t.:=()-'\"")).strip(" \t.:=()-")
+    if not name or not NAME_RE.match(name) or len(name.split()) > MAX_NAME_WORDS:
+        return None
+    return name
+
+
+def _is_filler(text):
+    """True for text with no name in it, e.g. the "weight" in "GPA 40% weight"."""
+    text = text.strip(" \t.:=()-'\"")
+    return (
+        not text
+        or not FILLER_RE.sub("", text + " ").strip()
+        or not FILLER_RE.sub("", " " + text).strip()
+    )
+
+
+def resolve_name(name, current=None):
+    """
+    Canonical criterion name: a configured name or synonym, an existing
+    criterion (matched case-insensitively), or the name itself.
+    """
+    canonical = get_mapping_index().resolve_criterion(name)
+    if canonical:
+        return canonical
+    for existing in current or {}:
+        if existing.casefold() == name.casefold():
+            return existing
+    return name.title() if name.islower() else name
+
+
+def _known(name, current):
+    """True for a configured criterion (or synonym) or an active one."""
+    return bool(get_mapping_index().resolve_criterion(name)) or name in (current or {})
+
+
+def _weight(number, percent):
+    value = float(number)
+    return value / 100 if percent else value
+
+
+def _normalize(weights):
+    total = sum(weights.values())
+    if total <= 0:
+        return None
+    return {name: float(value / total) for name, value in weights.items()}
+
+
+def _strip_sentence(message):
+    return message.strip().rstrip(".!").strip()
+
+
+def _parse_ratio(body, current):
+    match = RATIO_RE.search(body)
+    if not match:
+        return None
+    ratios = [float(part) for part in match.group(1).split(":")]
+    names_text = (body[: match.start()] + " " + body[match.end() :]).strip()
+    names_text = re.sub(
+        r"\b(?:in\s+)?(?:a|the)?\s*ratio(?:\s+of)?\b|=", " ", names_text
+    )
+    names = [
+        _clean_name(part)
+        for part in re.split(r"\s*(?:,|;|:|/|&|\band\b)\s*", names_text)
+        if part.strip()
+    ]
+    if len(names) != len(ratios) or not all(names):
+        return None
+    weights = {}
+    for name, ratio in zip(names, ratios):
+        resolved = resolve_name(name, current)
+        weights[resolved] = weights.get(resolved, 0.0) + ratio
+    return _normalize(weights)
+
+
+def _parse_list(body, current):
+    """Criteria list with optional per-item weights; None if any item is unclear."""
+    weighted, unweighted = {}, []
+    has_percent = False
+    for segment in SPLIT_RE.split(body):
+        if not segment.strip():
+            continue
+        numbers = re.findall(NUMBER, segment)
+        if len(numbers) > 1:
+            return None
+        # "Research 60% GPA" is two names around one weight, not one name
+        phrases = [p for p in NUMBER_SPLIT_RE.split(segment) if not _is_filler(p)]
+        if len(phrases) > 1:
+            return None
+        name = _clean_name(re.sub(NUMBER, " ", segment))
+        if not name:
+            return None
+        resolved = resolve_name(name, current)
+        if resolved in weighted or resolved in unweighted:
+            return None
+        if numbers:
+            number, percent = numbers[0]
+            has_percent = has_percent or bool(percent)
+            weighted[resolved] = (float(number), bool(percent))
+        else:
+            unweighted.append(resolved)
+
+    if not weighted and not unweighted:
+        return None
+    if not weighted:
+        return {name: 1 / len(unweighted) for name in unweighted}
+
+    # Percentages and decimals are fractions of 1; bare numbers above 1 are
+    # percentages when the message uses % anywhere, otherwise relative weights
+    values = {}
+    for name, (number, percent) in weighted.items():
+        if percent or (has_percent and number > 1):
+            if number > 100:
+                return None
+            values[name] = number / 100
+        else:
+            values[name] = number
+    if unweighted:
+        # Unweighted items share whatever the explicit fractions leave over
+        remaining = 1.0 - sum(values.values())
+        if remaining <= 1e-9 or any(v > 1 for v in values.values()):
+            return None
+        values.update({name: remaining / len(unweighted) for name in unweighted})
+    return _normalize(values)
+
+
+def _parse_change(verb, body, current):
+    """
+    Explicit new weights for some criteria, the rest rescaled to fill the
+    remainder. Returns (criteria, changed names) or None.
+    """
+    if RELATIVE_AMOUNT_RE.search(body):
+        return None
+    if verb.lower() in RELATIVE_VERBS and not re.search(r"\bto\b", body, re.I):
+        return None
+    changes = {}
+    for segment in SPLIT_RE.split(body):
+        if not segment.strip():
+            continue
+        match = CHANGE_ITEM_RE.match(segment.strip())
+        if not match:
+            return None
+        name = _clean_name(match.group(1))
+        if not name:
+            return None
+        value = _weight(match.group(2), match.group(3))
+        if value > 1 and not match.group(3):
+            # A bare "to 40" means 40%
+            value /= 100
+        if not 0 <= value <= 1:
+            return None
+        changes[resolve_name(name, current)] = value
+    if not changes or sum(changes.values()) > 1 + 1e-9:
+        return None
+    if sum(changes.values()) > 1 - 1e-9:
+        # "set GPA 40%, Research 60%" replaces the criteria outright
+        return _normalize(changes), []
+
+    # New criteria join with weight 0 so reweight can place them
+    base = dict(current)
+    base.update({name: 0.0 for name in changes if name not in base})
+    if all(name in changes for name in base):
+        return None
+    return _normalize(reweight(base, changes)), list(changes)
+
+
+def _parse_remove(body, current):
+    removed = set()
+    for segment in SPLIT_RE.split(body):
+        name = _clean_name(segment)
+        if not name:
+            continue
+        resolved = resolve_name(name, current)
+        if resolved not in current:
+            return None
+        removed.add(resolved)
+    remaining = {name: w for name, w in current.items() if name not in removed}
+    if not removed or not remaining:
+        return None
+    return _normalize(remaining)
+
+
+def _describe(criteria, current, kind, changed=()):
+    if kind == "remove":
+        removed = [name for name in current if name not in criteria]
+        return f"Removed {', '.join(removed)} and rescaled the remaining weights"
+    if kind == "change":
+        return f"Updated {', '.join(changed)} and rescaled the other weights"
+    if len(set(round(w, 9) for w in criteria.values())) == 1:
+        return f"Set {len(criteria)} evaluation criteria with equal weights"
+    return f"Set {len(criteria)} evaluation criteria with weights"
+
+
+def parse_criteria(message, current=None):
+    """
+    Parse a criteria message without the LLM.
+
+    Args:
+        message: The user's message
+        current: Currently active criteria (needed for changes and removals)
+
+    Returns:
+        {"criteria": {...}, "validation_message": str} shaped like the LLM
+        response validate_criteria expects, or None if the message isn't
+        understood
+    """
+    current = current or {}
+    text = _strip_sentence(message)
+    if not text:
+        return None
+
+    preamble = PREAMBLE_RE.match(text)
+    body = text[preamble.end() :] if preamble else text
+    if NOT_A_LIST_RE.search(body):
+        return None
+
+    criteria, kind, changed = None, "set", ()
+    remove = None if preamble else REMOVE_RE.match(text)
+    change = None if preamble else CHANGE_RE.match(text)
+    if remove and current:
+        criteria, kind = _parse_remove(remove.group(1), current), "remove"
+    elif change:
+        parsed = _parse_change(change.group(1), change.group(2), current)
+        if parsed:
+            criteria, changed = parsed
+            kind = "change" if changed else "set"
+    elif RATIO_RE.search(body):
+        criteria = _parse_ratio(body, current)
+    else:
+        criteria = _parse_list(body, current)
+
+    if not criteria:
+        return None
+    # Without "evaluate based on ..." only known criteria are accepted, so
+    # "I want GPA to be 50% and research 50%" isn't read as a list
+    if not preamble and not all(_known(name, current) for name in criteria):
+        return None
+    if preamble and PRIORITIZE_RE.search(preamble.group(0)) and len(criteria) == 1:
+        # "prioritize GPA" means more weight on GPA, not GPA alone
+        return None
+    return {
+        "criteria": criteria,
+        "validation_message": _describe(criteria, current, kind, changed),
+    }
@@ -0,0 +1,97 @@
+import math
+import re
+
+# Fields below this confidence are flagged for clarification
+LOW_CONFIDENCE_THRESHOLD = 0.7
+
+# Topic buckets answer_from_state reads: keywords looked up in field names,
+# and whether field values are searched as well
+FIELD_TOPICS = {
+    "gpa": (("gpa",), False),
+    "university": (("university", "college"), False),
+    "graduation": (("conferred", "graduation"), False),
+    "honors": (("honors",), True),
+    "research": (("research",), True),
+    "leadership": (("leadership",), True),
+}
+
+NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _as_confidence(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _source_key(certificate):
+    fields, confidence = certificate.extracted_fields, certificate.confidence
+    return (id(fields), len(fields), id(confidence), len(confidence))
+
+
+class FieldIndex:
+    """
+    Lookups derived from one extraction, built once instead of per turn.
+
+    Holds lowercase field names, topic buckets, the first number found in
+    each field value, confidences coerced to float (unreadable ones
+    dropped) and the low-confidence fields in extraction order.
+    """
+
+    def __init__(self, extracted_fields, confidence):
+        self.names = {name.lower(): name for name in extracted_fields}
+
+        self.confidence = {}
+        for name, value in confidence.items():
+            value = _as_confidence(value)
+            if value is not None:
+                self.confidence[name] = value
+        self.low_confidence = [
+            (name, value)
+            for name, value in self.confidence.items()
+            if value < LOW_CONFIDENCE_THRESHOLD
+        ]
+
+        self.numeric = {}
+        for name, value in extracted_fields.items():
+            match = NUMBER_RE.search(str(value))
+            if match:
+                self.numeric[name] = float(match.group())
+
+        self.topics = {topic: [] for topic in FIELD_TOPICS}
+        for name, value in extracted_fields.items():
+            lowered_name, lowered_value = name.lower(), str(value).lower()
+            for topic, (keywords, search_values) in FIELD_TOPICS.items():
+                if any(
+                    keyword in lowered_name
+                    or (search_values and keyword in lowered_value)
+                    for keyword in keywords
+                ):
+                    self.topics[topic].append(name)
+
+    def field(self, name):
+        """Actual field name for a case-insensitive name, or None."""
+        return self.names.get(name.lower())
+
+    def topic_fields(self, topic):
+        return self.topics.get(topic, [])
+
+
+def rebuild_field_index(certificate):
+    """Build and attach the index; call after extraction or load."""
+    index = FieldIndex(certificate.extracted_fields, certificate.confidence)
+    certificate._field_index = (_source_key(certificate), index)
+    return index
+
+
+def get_field_index(certificate):
+    """
+    The certificate's FieldIndex, rebuilt if the fields were replaced
+    since it was built.
+    """
+    cached = certificate._field_index
+    if cached is not None and cached[0] == _source_key(certificate):
+        return cached[1]
+    return rebuild_field_index(certificate)
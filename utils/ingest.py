@@ -0,0 +1,40 @@
+from utils.bm25 import certificate_retriever
+from utils.minhash import certificate_signature
+from utils.text_index import TextIndex
+
+# Persistent inverted index over every ingested certificate
+INDEX_DIR = "session_data/text_index"
+
+# Each session's certificate is indexed under its own document ID
+SESSION_DOC_PREFIX = "session:"
+# Document every session shared in older versions
+LEGACY_DOC = "current"
+
+_corpus_index = None
+
+
+def session_doc_id(session_id):
+    return f"{SESSION_DOC_PREFIX}{session_id}"
+
+
+def get_corpus_index():
+    """Return the shared on-disk corpus index, loading it on first use."""
+    global _corpus_index
+    if _corpus_index is None:
+        _corpus_index = TextIndex(INDEX_DIR)
+        _corpus_index.remove_document(LEGACY_DOC)
+    return _corpus_index
+
+
+def ingest_certificate(raw_text, session_id):
+    """
+    Prepare a session's certificate text when it is loaded.
+
+    Indexes it for full-text search (no-op if unchanged), precomputes its
+    MinHash signature for near-duplicate extraction reuse and builds the
+    BM25 retriever answer_from_state uses for free-form questions.
+    """
+    if raw_text.strip():
+        get_corpus_index().add_document(session_doc_id(session_id), raw_text)
+        certificate_signature(raw_text)
+        certificate_retriever(raw_text)
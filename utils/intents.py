@@ -0,0 +1,100 @@
+from functools import lru_cache
+
+from utils.keyword_matcher import KeywordMatcher
+
+# Intent phrases shared by the actions; a message is tagged with every
+# intent whose phrases occur in it (case-insensitive substring match)
+INTENT_PHRASES = {
+    "greeting": [
+        "hello",
+        "hi",
+        "hey",
+        "good morning",
+        "good afternoon",
+        "good evening",
+        "greetings",
+        "howdy",
+    ],
+    "farewell": [
+        "bye",
+        "goodbye",
+        "see you",
+        "farewell",
+        "take care",
+        "later",
+        "gotta go",
+        "have to go",
+    ],
+    "gratitude": [
+        "thank you",
+        "thanks",
+        "appreciate",
+        "got it",
+        "understood",
+        "ok thanks",
+        "okay thanks",
+        "cool thanks",
+    ],
+    "capability": [
+        "what can you do",
+        "help",
+        "capabilities",
+        "what do you do",
+        "how does this work",
+    ],
+    "previous_action": [
+        "explain your last",
+        "explain the last",
+        "why did you",
+        "explain your previous",
+        "explain that",
+    ],
+    "overview": [
+        "summarize",
+        "summarise",
+        "summary",
+        "overview",
+        "what is on",
+        "what's on",
+        "whats on",
+        "all the information",
+        "everything on",
+    ],
+    "is_there": ["is there", "are there", "any other", "another", "multiple"],
+    "wants_score": ["score", "calculate", "rate", "evaluate", "scoring"],
+    "force_reextract": [
+        "re-extract",
+        "reextract",
+        "extract again",
+        "fresh extraction",
+        "update data",
+        "refresh data",
+    ],
+}
+INTENTS = tuple(INTENT_PHRASES)
+
+# Every phrase compiled into one matcher; each intent owns a bitmask of them
+_MATCHER = KeywordMatcher(
+    [phrase for phrases in INTENT_PHRASES.values() for phrase in phrases]
+)
+_INTENT_MASKS = {
+    intent: sum(_MATCHER.bit(phrase) for phrase in set(phrases))
+    for intent, phrases in INTENT_PHRASES.items()
+}
+
+
+@lru_cache(maxsize=1024)
+def tag_message(message):
+    """Frozenset of every intent the message expresses, from one matcher call."""
+    found = _MATCHER.mask(message)
+    return frozenset(intent for intent, mask in _INTENT_MASKS.items() if found & mask)
+
+
+def has_intent(message, intent):
+    return intent in tag_message(message)
+
+
+def intent_features(message):
+    """0/1 feature per intent, in INTENTS order, e.g. for the router prompt."""
+    tags = tag_message(message)
+    return {intent: int(intent in tags) for intent in INTENTS}
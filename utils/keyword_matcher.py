@@ -0,0 +1,118 @@
+from collections import deque
+
+# Below this many keywords CPython's C-level substring search beats walking a
+# Python-level automaton over every character, whatever the text length
+# (crossover measured in benchmarks/bench_keyword_matcher.py)
+AUTOMATON_MIN_KEYWORDS = 128
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick multi-pattern matcher, compiled once per keyword set.
+
+    Finds every keyword occurring anywhere in a text (substring semantics,
+    overlaps included, case-insensitive by default) with one call that
+    returns all matches as a bitmask, so callers with several keyword
+    groups scan the text once instead of once per group.
+
+    The automaton is stored as a full DFA: each state maps a character to
+    the next state, so scanning needs no failure-link walks. Small keyword
+    sets skip the automaton and test each folded keyword directly, which is
+    faster in CPython; pass use_automaton to force either strategy.
+    """
+
+    def __init__(self, keywords, case_insensitive=True, use_automaton=None):
+        self.case_insensitive = case_insensitive
+        self.keywords = list(dict.fromkeys(self._fold(k) for k in keywords if k))
+        self._index = {keyword: i for i, keyword in enumerate(self.keywords)}
+        self._bits = [(1 << i, keyword) for i, keyword in enumerate(self.keywords)]
+
+        if use_automaton is None:
+            use_automaton = len(self.keywords) >= AUTOMATON_MIN_KEYWORDS
+        self._delta = None
+        if use_automaton:
+            self._build_automaton()
+
+    def _build_automaton(self):
+        """Compile the keyword trie and failure links into a DFA."""
+        # Trie: goto[state] = {char: state}; outputs[state] = keyword bitmask
+        goto = [{}]
+        outputs = [0]
+        for bit, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append(0)
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state] |= 1 << bit
+
+        # Breadth-first failure links, folded straight into DFA transitions
+        fail = [0] * len(goto)
+        delta = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            delta[state] = dict(delta[fail[state]]) if state else delta[state]
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0) if state else 0
+                delta[state][char] = child
+                queue.append(child)
+
+        self._delta = delta
+        self._outputs = outputs
+
+    def _fold(self, text):
+        return text.lower() if self.case_insensitive else text
+
+    def mask(self, text):
+        """Bitmask of matched keywords; bit i is set for self.keywords[i]."""
+        if self._delta is None:
+            text = self._fold(text)
+            found = 0
+            for bit, keyword in self._bits:
+                if keyword in text:
+                    found |= bit
+            return found
+
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        found = 0
+        for char in self._fold(text):
+            state = delta[state].get(char, 0)
+            found |= outputs[state]
+        return found
+
+    def find_all(self, text):
+        """Set of keywords (case-folded) that occur in the text."""
+        found = self.mask(text)
+        return {
+            keyword for bit, keyword in enumerate(self.keywords) if found >> bit & 1
+        }
+
+    def matches_any(self, text):
+        """True as soon as any keyword is found."""
+        if self._delta is None:
+            text = self._fold(text)
+            return any(keyword in text for keyword in self.keywords)
+
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for char in self._fold(text):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                return True
+        return False
+
+    def bit(self, keyword):
+        """Bitmask for one compiled keyword (0 if it isn't compiled)."""
+        i = self._index.get(self._fold(keyword))
+        return 0 if i is None else 1 << i
+
+    def __len__(self):
+        return len(self.keywords)
@@ -0,0 +1,95 @@
+import heapq
+import itertools
+import threading
+from typing import Dict, NamedTuple
+
+
+class LeaderboardEntry(NamedTuple):
+    rank: int
+    label: str
+    final_score: float
+    scores: Dict[str, float]
+
+
+class Leaderboard:
+    """
+    Bounded top-k leaderboard for streaming certificate scores.
+
+    Keeps only the best k results in a min-heap, so memory stays O(k)
+    however many certificates are pushed. Results are ordered by final
+    score, then by the per-criterion secondary keys, then by arrival
+    order (earlier submissions win exact ties). Entries whose final
+    score and secondary keys are equal share a rank.
+
+    Safe to query from another thread while a batch run is pushing.
+    """
+
+    def __init__(self, k=50, secondary_keys=()):
+        if k < 1:
+            raise ValueError("Leaderboard size k must be at least 1")
+        self.k = k
+        self.secondary_keys = tuple(secondary_keys)
+        self.seen = 0
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _sort_key(self, final_score, scores):
+        secondary = tuple(
+            float(scores.get(key, float("-inf"))) for key in self.secondary_keys
+        )
+        return (float(final_score),) + secondary
+
+    def push(self, label, final_score, scores=None):
+        """
+        Offer one scored certificate to the leaderboard.
+
+        Returns:
+            True if it entered the top k, False if it was discarded
+        """
+        scores = scores or {}
+        key = self._sort_key(final_score, scores)
+        with self._lock:
+            self.seen += 1
+            # Negated arrival order: among equal keys the latest is the worst
+            item = (key, -next(self._counter), label, final_score, dict(scores))
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+                return True
+            if item[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, item)
+                return True
+            return False
+
+    def threshold(self):
+        """Final score a new certificate must beat once the board is full."""
+        with self._lock:
+            if len(self._heap) < self.k:
+                return None
+            return self._heap[0][3]
+
+    def top(self, n=None):
+        """
+        Snapshot of the current leaders, best first.
+
+        Args:
+            n: Optional number of entries to return (defaults to all k)
+
+        Returns:
+            List of LeaderboardEntry tuples with competition ranking for ties
+        """
+        with self._lock:
+            items = sorted(self._heap, key=lambda item: item[:2], reverse=True)
+
+        entries = []
+        for position, (key, _, label, final_score, scores) in enumerate(items[:n]):
+            if entries and key == previous_key:
+                rank = entries[-1].rank
+            else:
+                rank = position + 1
+            previous_key = key
+            entries.append(LeaderboardEntry(rank, label, final_score, scores))
+        return entries
+
+    def __len__(self):
+        return len(self._heap)
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from utils.keyword_matcher import KeywordMatcher
+
+# Field-mapping and topic tables, editable without touching code
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "config" / "mappings.json"
+
+# Seconds between mtime checks, so hot calls don't stat the file every time
+RELOAD_INTERVAL = 2.0
+
+
+class MappingIndex:
+    """
+    Compiled, case-folded view of the mapping config.
+
+    Criterion lookups are a single dict access on the folded name and topic
+    detection is one KeywordMatcher call over the message. version changes
+    on every reload so caches built from the tables can tell they're stale;
+    fingerprint identifies the table contents, so results saved across
+    restarts can be checked too.
+    """
+
+    def __init__(self, data, version=0):
+        self.version = version
+        self.fingerprint = hashlib.sha1(
+            json.dumps(data, sort_keys=True).encode()
+        ).hexdigest()
+        self.field_mapping = {
+            criterion.casefold(): tuple(keywords)
+            for criterion, keywords in data.get("field_mapping", {}).items()
+        }
+        # Canonical criterion name for every folded name or synonym
+        self.criterion_names = {
+            criterion.casefold(): criterion
+            for criterion in data.get("field_mapping", {})
+        }
+        for criterion, synonyms in data.get("criteria_synonyms", {}).items():
+            self.criterion_names[criterion.casefold()] = criterion
+            for synonym in synonyms:
+                self.criterion_names[synonym.casefold()] = criterion
+
+        self.topics = {
+            topic: tuple(keywords) for topic, keywords in data.get("topics", {}).items()
+        }
+
+        self.topic_matcher = KeywordMatcher(
+            [keyword for keywords in self.topics.values() for keyword in keywords]
+        )
+        self.topic_masks = {
+            topic: sum(self.topic_matcher.bit(keyword) for keyword in set(keywords))
+            for topic, keywords in self.topics.items()
+        }
+
+    def criterion_keywords(self, criterion):
+        """Field keywords for a criterion; unknown criteria match their own name."""
+        return self.field_mapping.get(criterion.casefold(), (criterion,))
+
+    def resolve_criterion(self, name):
+        """Canonical name for a criterion or one of its synonyms, else None."""
+        return self.criterion_names.get(name.casefold())
+
+    def topic_of(self, message):
+        """First topic (in config order) with a keyword in the message, or None."""
+        asked = self.topic_matcher.mask(message)
+        if asked:
+            for topic, topic_mask in self.topic_masks.items():
+                if asked & topic_mask:
+                    return topic
+        return None
+
+
+_index = None
+_mtime = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _load(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def get_mapping_index():
+    """
+    Shared MappingIndex, reloaded when the config file's mtime changes.
+
+    The mtime is polled at most every RELOAD_INTERVAL seconds. A config
+    that fails to load keeps the previous index in place.
+    """
+    global _index, _mtime, _checked_at
+    path = CONFIG_PATH
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < RELOAD_INTERVAL:
+        return _index
+
+    with _lock:
+        _checked_at = now
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError as e:
+            if _index is None:
+                print(f"⚠️ Mapping config unavailable ({e}); using empty tables")
+                _index = MappingIndex({})
+            return _index
+
+        if _index is None or mtime != _mtime:
+            _mtime = mtime
+            try:
+                version = 0 if _index is None else _index.version + 1
+                _index = MappingIndex(_load(path), version)
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"⚠️ Failed to reload mapping config: {e}")
+                if _index is None:
+                    _index = MappingIndex({})
+        return _index
@@ -0,0 +1,60 @@
+import threading
+from collections import defaultdict
+
+# Process-wide counters and timing samples for the session stats
+_counters = defaultdict(int)
+_samples = {}
+_lock = threading.Lock()
+
+
+def increment(name, amount=1):
+    """Add to a named counter."""
+    with _lock:
+        _counters[name] += amount
+
+
+def observe(name, value):
+    """Record one sample (e.g. a latency in ms) under a name."""
+    with _lock:
+        count, total, peak = _samples.get(name, (0, 0.0, float("-inf")))
+        _samples[name] = (count + 1, total + value, max(peak, value))
+
+
+def counter(name):
+    return _counters.get(name, 0)
+
+
+def summary(name):
+    """
+    Aggregate of the samples recorded under a name.
+
+    Returns:
+        Dict with count, total, mean and max (all zero when nothing was recorded)
+    """
+    count, total, peak = _samples.get(name, (0, 0.0, 0.0))
+    return {
+        "count": count,
+        "total": total,
+        "mean": total / count if count else 0.0,
+        "max": peak,
+    }
+
+
+def hit_rate(prefix):
+    """Share of "<prefix>.hits" among hits and misses, or None before any lookup."""
+    hits, misses = counter(f"{prefix}.hits"), counter(f"{prefix}.misses")
+    return hits / (hits + misses) if hits + misses else None
+
+
+def snapshot():
+    """Copy of all counters and sample aggregates."""
+    with _lock:
+        counters = dict(_counters)
+        names = list(_samples)
+    return {"counters": counters, "samples": {name: summary(name) for name in names}}
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _samples.clear()
@@ -0,0 +1,230 @@
+import json
+import shutil
+import threading
+import zlib
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from utils.text_index import text_fingerprint, tokenize
+
+NUM_PERM = 128
+SHINGLE_SIZE = 3
+
+# 16 bands x 8 rows puts the LSH candidate threshold near 0.7 Jaccard
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+_rng = np.random.RandomState(1)
+PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text, k=SHINGLE_SIZE):
+    """
+    Word k-shingles of normalised text.
+
+    Tokenizing first makes the shingles blind to whitespace, case and
+    punctuation changes, which is what resubmitted certificates differ by.
+    """
+    tokens = tokenize(text)
+    if len(tokens) < k:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i : i + k]) for i in range(len(tokens) - k + 1)}
+
+
+def minhash_signature(text):
+    """128-value MinHash signature of a text as a uint64 numpy array."""
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles(text)), dtype=np.uint64
+    )
+    if hashes.size == 0:
+        return np.full(NUM_PERM, MAX_HASH, dtype=np.uint64)
+    # (a * h + b) mod p for every permutation/shingle pair, min per permutation
+    permuted = (np.outer(PERM_A, hashes) + PERM_B[:, None]) % MERSENNE_PRIME
+    return (permuted & MAX_HASH).min(axis=1)
+
+
+@lru_cache(maxsize=64)
+def certificate_signature(raw_text):
+    """Signature of a certificate's text, cached so ingest can precompute it."""
+    return minhash_signature(raw_text)
+
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity: share of matching signature slots."""
+    return float(np.count_nonzero(sig_a == sig_b)) / sig_a.size
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over MinHash signatures for sublinear near-duplicate lookup.
+
+    Each signature is split into bands; documents sharing any band land in
+    the same bucket and become candidates, which are then confirmed with the
+    signature similarity estimate.
+
+    With a storage directory every added entry is appended to a JSONL file
+    together with an optional payload (e.g. a cached extraction) and the
+    buckets are rebuilt from it on load.
+    """
+
+    def __init__(self, storage_dir=None, threshold=0.8):
+        self.threshold = threshold
+        self.signatures = {}
+        self.payloads = {}
+        self._buckets = [defaultdict(list) for _ in range(BANDS)]
+        self.storage_file = None
+
+        if storage_dir:
+            storage_dir = Path(storage_dir)
+            storage_dir.mkdir(parents=True, exist_ok=True)
+            self.storage_file = storage_dir / "signatures.jsonl"
+            self._load()
+
+    def _band_keys(self, signature):
+        return [signature[b * ROWS : (b + 1) * ROWS].tobytes() for b in range(BANDS)]
+
+    def _insert(self, key, signature, payload):
+        if key in self.signatures:
+            self.payloads[key] = payload
+            return
+        self.signatures[key] = signature
+        self.payloads[key] = payload
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket[band_key].append(key)
+
+    def add(self, key, signature, payload=None):
+        """Add a signature under a key, persisting it when storage is enabled."""
+        self._insert(key, signature, payload)
+        if self.storage_file:
+            entry = {"key": key, "signature": signature.tolist(), "payload": payload}
+            with open(self.storage_file, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def query(self, signature, threshold=None):
+        """
+        Find near-duplicates of a signature.
+
+        Returns:
+            List of (key, estimated_similarity) sorted by similarity, highest first
+        """
+        threshold = self.threshold if threshold is None else threshold
+        candidates = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+
+        matches = []
+        for key in candidates:
+            similarity = estimate_similarity(signature, self.signatures[key])
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def _load(self):
+        if not self.storage_file.exists():
+            return
+        try:
+            with open(self.storage_file, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        signature = np.asarray(entry["signature"], dtype=np.uint64)
+                        self._insert(entry["key"], signature, entry.get("payload"))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Failed to load near-duplicate index: {e}")
+
+    def __len__(self):
+        return len(self.signatures)
+
+
+# Extractions keyed by the certificate's normalised tokens, one store per
+# session so extractions never cross sessions. The LSH index over the same
+# entries only reports near-duplicates; those are never reused, since a
+# certificate on the same template with a different name or GPA is one too.
+EXTRACTION_CACHE_DIR = Path("session_data") / "extraction_cache"
+
+# Sessions whose extraction index stays loaded in this process
+EXTRACTION_INDEX_CACHE_SIZE = 64
+
+_extraction_indexes = OrderedDict()
+_extraction_lock = threading.Lock()
+
+
+def _extraction_dir(session_id):
+    # Hashed, so a session ID from a URL can't name an arbitrary path
+    return EXTRACTION_CACHE_DIR / text_fingerprint(session_id)
+
+
+def get_extraction_index(session_id):
+    """The session's extraction index; least recently used ones are evicted."""
+    with _extraction_lock:
+        index = _extraction_indexes.get(session_id)
+        if index is None:
+            index = NearDuplicateIndex(_extraction_dir(session_id))
+            _extraction_indexes[session_id] = index
+            while len(_extraction_indexes) > EXTRACTION_INDEX_CACHE_SIZE:
+                _extraction_indexes.popitem(last=False)
+        else:
+            _extraction_indexes.move_to_end(session_id)
+        return index
+
+
+def forget_extractions(session_id):
+    """Drop a session's cached extractions from memory and disk."""
+    with _extraction_lock:
+        _extraction_indexes.pop(session_id, None)
+    shutil.rmtree(_extraction_dir(session_id), ignore_errors=True)
+
+
+def token_fingerprint(raw_text):
+    """Hash of the normalised token sequence (case, spacing, punctuation ignored)."""
+    return text_fingerprint(" ".join(tokenize(raw_text)))
+
+
+def find_cached_extraction(raw_text, session_id):
+    """
+    This session's extraction of a resubmission of this certificate: the
+    same normalised tokens, so only whitespace, case or punctuation differ.
+
+    Returns:
+        The cached payload, or None
+    """
+    if not raw_text.strip():
+        return None
+    payload = get_extraction_index(session_id).payloads.get(token_fingerprint(raw_text))
+    return payload if payload and payload.get("fields") else None
+
+
+def find_similar_extraction(raw_text, session_id):
+    """
+    The most similar certificate this session extracted before, other than
+    a resubmission of this one, for reporting only.
+
+    Returns:
+        Estimated similarity (0-1) of the closest near-duplicate, or None
+    """
+    if not raw_text.strip():
+        return None
+    tokens = token_fingerprint(raw_text)
+    for key, similarity in get_extraction_index(session_id).query(
+        certificate_signature(raw_text)
+    ):
+        if key != tokens:
+            return similarity
+    return None
+
+
+def remember_extraction(raw_text, fields, confidence, session_id):
+    """Store an extraction so this session's resubmissions can reuse it."""
+    if raw_text.strip() and fields:
+        get_extraction_index(session_id).add(
+            token_fingerprint(raw_text),
+            certificate_signature(raw_text),
+            {"fields": fields, "confidence": confidence},
+        )
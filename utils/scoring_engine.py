@@ -0,0 +1,255 @@
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from utils.keyword_matcher import KeywordMatcher
+from utils.mapping_config import get_mapping_index
+from utils.text_index import text_contains
+
+# Scores used when a criterion can't be read from confidence values
+NON_NUMERIC_SCORE = 50.0
+TEXT_ONLY_SCORE = 70.0
+NOT_FOUND_SCORE = 30.0
+
+# Bound on the per-string keyword hit cache shared across batches
+HIT_CACHE_SIZE = 100_000
+# Bound on the per-certificate raw-text masks; keys are whole certificate
+# texts, so far fewer are kept
+TEXT_CACHE_SIZE = 1024
+
+
+# The engines and their caches are shared by every Streamlit thread. Each
+# OrderedDict call is atomic, but another thread can evict a key between
+# two of them; that only costs a cache entry, so it isn't locked
+def lru_get(cache, key):
+    value = cache.get(key)
+    if value is not None:
+        try:
+            cache.move_to_end(key)
+        except KeyError:
+            pass  # evicted meanwhile
+    return value
+
+
+def lru_put(cache, key, value, size):
+    cache[key] = value
+    while len(cache) > size:
+        try:
+            cache.popitem(last=False)
+        except KeyError:
+            break  # emptied meanwhile
+
+
+def criterion_keywords(criterion):
+    """Return the field keywords used to match a criterion (config/mappings.json)."""
+    return get_mapping_index().criterion_keywords(criterion)
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class ScoringEngine:
+    """
+    Criteria compiled into a keyword-to-criterion matrix.
+
+    Scoring rules (per criterion, unweighted 0-100):
+      - average confidence x 100 of extracted fields whose name or value
+        contains one of the criterion's keywords (and that have a confidence)
+      - 50 if fields matched but none had a numeric confidence
+      - 70 if nothing matched but a keyword appears in the raw text
+      - 30 otherwise
+
+    Weighted scores are raw x weight and the final score is their sum
+    divided by the total weight - the same numbers rescore_certificate
+    has always reported.
+    """
+
+    def __init__(self, criteria):
+        self.criteria = list(criteria)
+        self.weights = np.asarray(
+            [criteria[name] for name in self.criteria], dtype=np.float64
+        )
+        self.total_weight = float(self.weights.sum())
+
+        keyword_lists = [criterion_keywords(name) for name in self.criteria]
+        self.keywords = sorted(
+            {k.lower() for keywords in keyword_lists for k in keywords}
+        )
+        position = {keyword: i for i, keyword in enumerate(self.keywords)}
+
+        # keyword_matrix[k, c] is 1 when keyword k belongs to criterion c
+        self.keyword_matrix = np.zeros(
+            (len(self.keywords), len(self.criteria)), dtype=np.int32
+        )
+        for c, keywords in enumerate(keyword_lists):
+            for keyword in keywords:
+                self.keyword_matrix[position[keyword.lower()], c] = 1
+
+        # Same matrix as one bitmask per criterion, for cheap per-field tests
+        self.criterion_masks = [
+            sum(1 << k for k in np.nonzero(self.keyword_matrix[:, c])[0])
+            for c in range(len(self.criteria))
+        ]
+
+        # One matcher call per string finds every keyword (Aho-Corasick once
+        # the keyword set is large enough); its bit order matches self.keywords
+        self._matcher = KeywordMatcher(self.keywords)
+        # Least recently used entries are evicted once a cache is full
+        self._hit_cache = OrderedDict()
+        self._text_cache = OrderedDict()
+
+    def _keyword_mask(self, text):
+        """Bitmask of the compiled keywords that occur in the text."""
+        mask = lru_get(self._hit_cache, text)
+        if mask is None:
+            mask = self._matcher.mask(text)
+            lru_put(self._hit_cache, text, mask, HIT_CACHE_SIZE)
+        return mask
+
+    def raw_scores(self, certificates):
+        """
+        Unweighted criterion scores for a batch of CertificateStates.
+
+        Returns:
+            numpy array of shape (len(certificates), len(criteria))
+        """
+        n, c = len(certificates), len(self.criteria)
+        if n == 0 or c == 0:
+            return np.zeros((n, c))
+
+        # One entry per (certificate, field with a confidence entry); field
+        # names repeat across certificates so their masks are cached
+        masks, confidences, field_counts = [], [], []
+        keyword_mask = self._keyword_mask
+        for certificate in certificates:
+            confidence = certificate.confidence
+            count = 0
+            for name, value in certificate.extracted_fields.items():
+                if name not in confidence:
+                    continue
+                if not isinstance(value, str):
+                    value = str(value)
+                masks.append(keyword_mask(name) | keyword_mask(value))
+                confidences.append(confidence[name])
+                count += 1
+            field_counts.append(count)
+
+        # (fields x criteria) match matrix from the keyword bitmasks
+        if len(self.keywords) < 64:
+            matches = (
+                np.asarray(masks, dtype=np.uint64)[:, None]
+                & np.asarray(self.criterion_masks, dtype=np.uint64)[None, :]
+            ) != 0
+        else:
+            matches = np.array(
+                [[mask & m != 0 for m in self.criterion_masks] for mask in masks],
+                dtype=bool,
+            ).reshape(len(masks), c)
+        try:
+            conf = np.asarray(confidences, dtype=np.float64)
+        except (TypeError, ValueError):
+            conf = np.asarray([_as_float(v) for v in confidences], dtype=np.float64)
+        numeric = matches & ~np.isnan(conf)[:, None]
+
+        field_counts = np.asarray(field_counts)
+        matched_count = _segment_sum(matches, field_counts)
+        numeric_count = _segment_sum(numeric, field_counts)
+        confidence_sum = _segment_sum(
+            np.where(numeric, conf[:, None], 0.0), field_counts
+        )
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scores = np.where(
+                numeric_count > 0,
+                confidence_sum / numeric_count * 100,
+                NON_NUMERIC_SCORE,
+            )
+
+        # Raw-text fallback only for criteria with no matched fields. Keywords
+        # match as plain substrings of the lowercased text, like text_contains
+        unmatched = matched_count == 0
+        for i in np.nonzero(unmatched.any(axis=1))[0]:
+            text_mask = self._text_mask(certificates[i].raw_text)
+            for j in np.nonzero(unmatched[i])[0]:
+                if text_mask & self.criterion_masks[j]:
+                    scores[i, j] = TEXT_ONLY_SCORE
+                else:
+                    scores[i, j] = NOT_FOUND_SCORE
+        return scores
+
+    def matched_fields(self, certificate):
+        """
+        Fields each criterion matched, under the same rule as raw_scores.
+
+        Returns:
+            Dict of criterion name to the matching field names
+        """
+        matched = {name: [] for name in self.criteria}
+        confidence = certificate.confidence
+        for field, value in certificate.extracted_fields.items():
+            if field not in confidence:
+                continue
+            mask = self._keyword_mask(field) | self._keyword_mask(str(value))
+            for name, criterion_mask in zip(self.criteria, self.criterion_masks):
+                if mask & criterion_mask:
+                    matched[name].append(field)
+        return matched
+
+    def _text_mask(self, raw_text):
+        """Bitmask of the compiled keywords found in certificate text."""
+        mask = lru_get(self._text_cache, raw_text)
+        if mask is None:
+            mask = 0
+            for bit, keyword in enumerate(self.keywords):
+                if keyword and text_contains(raw_text, keyword):
+                    mask |= 1 << bit
+            lru_put(self._text_cache, raw_text, mask, TEXT_CACHE_SIZE)
+        return mask
+
+    def score_batch(self, certificates):
+        """
+        Weighted scores and final scores for a batch.
+
+        Returns:
+            (weighted, final_scores) arrays of shape (n, c) and (n,)
+        """
+        weighted = self.raw_scores(certificates) * self.weights
+        if self.total_weight > 0:
+            final_scores = weighted.sum(axis=1) / self.total_weight
+        else:
+            final_scores = np.zeros(len(certificates))
+        return weighted, final_scores
+
+    def score_one(self, certificate):
+        """(scores dict, final_score) for one certificate, as rescore reports them."""
+        weighted, final_scores = self.score_batch([certificate])
+        scores = {name: float(weighted[0, j]) for j, name in enumerate(self.criteria)}
+        return scores, float(final_scores[0])
+
+
+def _segment_sum(rows, counts):
+    """Sum consecutive row segments (one per certificate) of a 2-D array."""
+    out = np.zeros((counts.size, rows.shape[1]))
+    nonempty = counts > 0
+    if rows.shape[0]:
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        out[nonempty] = np.add.reduceat(rows.astype(np.float64), starts[nonempty])
+    return out
+
+
+@lru_cache(maxsize=32)
+def _compiled_engine(criteria_items, mapping_version):
+    return ScoringEngine(dict(criteria_items))
+
+
+def get_engine(criteria):
+    """
+    Compiled engine for a criteria dict, reused while the criteria and the
+    mapping config are unchanged.
+    """
+    return _compiled_engine(tuple(criteria.items()), get_mapping_index().version)
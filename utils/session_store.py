@@ -0,0 +1,365 @@
+"""
+SQLite store for many sessions, keyed by session ID.
+
+Each session has a row in ``sessions`` (timestamps plus summary counts,
+indexed by last update), one row per sub-state (certificate, evaluation,
+conversation) holding its last snapshot, one row per conversation history
+in ``history_segments``, and the journal records written since that
+snapshot. A snapshot upserts only the sub-states and histories that
+changed and drops the journal rows it covers, all in one transaction.
+
+The ``sessions`` row is a header that answers status checks on its own,
+and histories keep their length and counts outside the encoded entries,
+so a session can be restored with its histories deferred: they are read
+only when something needs their entries.
+
+The database runs in WAL mode with a busy timeout, so several processes
+(e.g. Streamlit workers) can read while one writes, and writers wait for
+each other instead of failing. Connections are per thread.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+
+from utils.bounded_history import BoundedHistory, saved_history_length
+from utils.codec import get_codec
+from utils.snapshot_store import HISTORY_FIELDS, apply_changes
+
+SUB_STATES = ("certificate", "evaluation", "conversation")
+# Sub-state whose history fields are stored as separate segments
+HISTORY_SECTION = "conversation"
+BUSY_TIMEOUT_SECONDS = 10.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    journal_seq INTEGER NOT NULL DEFAULT 0,
+    exchanges INTEGER NOT NULL DEFAULT 0,
+    extracted_fields INTEGER NOT NULL DEFAULT 0,
+    criteria INTEGER NOT NULL DEFAULT 0,
+    final_score REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_by_update ON sessions (updated_at);
+CREATE TABLE IF NOT EXISTS sub_states (
+    session_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL,
+    codec TEXT NOT NULL DEFAULT 'json',
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (session_id, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS journal (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    record BLOB NOT NULL,
+    codec TEXT NOT NULL DEFAULT 'json',
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS history_segments (
+    session_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    counts BLOB NOT NULL,
+    data BLOB NOT NULL,
+    codec TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (session_id, name)
+);
+"""
+
+# Columns added after the first release of the schema
+MIGRATIONS = {
+    "sub_states": {"codec": "TEXT NOT NULL DEFAULT 'json'"},
+    "journal": {"codec": "TEXT NOT NULL DEFAULT 'json'"},
+}
+
+
+def summary_updates(sections):
+    """
+    Summary column values implied by changed (or full) sub-states.
+    Appended history entries come back as a count to add.
+
+    Returns:
+        (absolute values, exchanges to add)
+    """
+    values, added = {}, 0
+    history = sections.get("conversation", {}).get("conversation_history")
+    if isinstance(history, dict) and "append" in history:
+        added = len(history["append"])
+    elif history is not None:
+        values["exchanges"] = saved_history_length(history)
+    certificate = sections.get("certificate", {})
+    evaluation = sections.get("evaluation", {})
+    if "extracted_fields" in certificate:
+        values["extracted_fields"] = len(certificate["extracted_fields"])
+    if "criteria" in evaluation:
+        values["criteria"] = len(evaluation["criteria"])
+    if "final_score" in evaluation:
+        values["final_score"] = evaluation["final_score"]
+    return values, added
+
+
+class SessionStore:
+    """Session snapshots and journals in one SQLite database."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        for table, columns in MIGRATIONS.items():
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for column, definition in columns.items():
+                if column not in existing:
+                    conn.execute(
+                        f"ALTER TABLE {table} ADD COLUMN {column} {definition}"
+                    )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Commits are the batched fsync points for background saves
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        # Take the write lock up front so concurrent writers queue on the
+        # busy timeout instead of failing mid-transaction
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _touch(self, conn, session_id, now, values, added=0, journal_seq=None):
+        conn.execute(
+            "INSERT INTO sessions (session_id, created_at, updated_at) "
+            "VALUES (?, ?, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET updated_at = excluded.updated_at",
+            (session_id, now, now),
+        )
+        assignments = [f"{column} = ?" for column in values]
+        params = list(values.values())
+        if added:
+            assignments.append("exchanges = exchanges + ?")
+            params.append(added)
+        if journal_seq is not None:
+            assignments.append("journal_seq = ?")
+            params.append(journal_seq)
+        if assignments:
+            conn.execute(
+                f"UPDATE sessions SET {', '.join(assignments)} WHERE session_id = ?",
+                params + [session_id],
+            )
+
+    def append_journal(self, session_id, records, codec):
+        """
+        Append journal records in one transaction and keep the session's
+        summary columns current.
+
+        Args:
+            records: (decoded record, record encoded with codec) pairs
+
+        Returns:
+            Bytes of record data written
+        """
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO journal (session_id, seq, record, codec) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (session_id, record["seq"], payload, codec.name)
+                    for record, payload in records
+                ],
+            )
+            for record, _ in records:
+                values, added = summary_updates(record["changes"])
+                self._touch(conn, session_id, now, values, added)
+        return sum(len(payload) for _, payload in records)
+
+    def write_snapshot(
+        self, session_id, state_data, sub_states, codec, histories=HISTORY_FIELDS
+    ):
+        """
+        Upsert the given sub-states and history segments from a full
+        saved-state dict and drop the journal records it covers.
+
+        Returns:
+            Bytes of sub-state and history data written
+        """
+        now = datetime.now().isoformat()
+        journal_seq = state_data.get("journal_seq", 0)
+        rows = [
+            (
+                session_id,
+                name,
+                codec.encode(self._without_histories(name, state_data)),
+                codec.name,
+                now,
+            )
+            for name in sub_states
+        ]
+        segments = []
+        for name in histories:
+            saved = state_data[HISTORY_SECTION][name]
+            counts = saved.get("counts") if isinstance(saved, dict) else None
+            segments.append(
+                (
+                    session_id,
+                    name,
+                    saved_history_length(saved),
+                    codec.encode(counts),
+                    codec.encode(saved),
+                    codec.name,
+                    now,
+                )
+            )
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO history_segments "
+                "(session_id, name, length, counts, data, codec, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (session_id, name) DO UPDATE SET "
+                "length = excluded.length, counts = excluded.counts, "
+                "data = excluded.data, codec = excluded.codec, "
+                "updated_at = excluded.updated_at",
+                segments,
+            )
+            conn.executemany(
+                "INSERT INTO sub_states (session_id, name, data, codec, updated_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (session_id, name) DO UPDATE SET "
+                "data = excluded.data, codec = excluded.codec, "
+                "updated_at = excluded.updated_at",
+                rows,
+            )
+            values, _ = summary_updates(state_data)
+            self._touch(conn, session_id, now, values, journal_seq=journal_seq)
+            conn.execute(
+                "DELETE FROM journal WHERE session_id = ? AND seq <= ?",
+                (session_id, journal_seq),
+            )
+        return sum(len(row[2]) for row in rows) + sum(
+            len(row[3]) + len(row[4]) for row in segments
+        )
+
+    @staticmethod
+    def _without_histories(name, state_data):
+        if name != HISTORY_SECTION:
+            return state_data[name]
+        return {
+            field: value
+            for field, value in state_data[name].items()
+            if field not in HISTORY_FIELDS
+        }
+
+    def read_history(self, session_id, name):
+        """A history segment's saved form, or [] when there is none."""
+        row = (
+            self._connection()
+            .execute(
+                "SELECT data, codec FROM history_segments "
+                "WHERE session_id = ? AND name = ?",
+                (session_id, name),
+            )
+            .fetchone()
+        )
+        return get_codec(row[1]).decode(row[0]) if row else []
+
+    def read_session(self, session_id, histories=True):
+        """
+        A session's last snapshot with its journal replayed, or None.
+
+        Args:
+            histories: False to leave history entries unread; histories come
+                back as deferred BoundedHistory objects that load on first read
+
+        Returns:
+            (state_data, number of journal records replayed)
+        """
+        conn = self._connection()
+        meta = conn.execute(
+            "SELECT updated_at, journal_seq FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        if meta is None:
+            return None
+        state_data = {"timestamp": meta[0], "journal_seq": meta[1]}
+        for name, data, codec in conn.execute(
+            "SELECT name, data, codec FROM sub_states WHERE session_id = ?",
+            (session_id,),
+        ):
+            state_data[name] = get_codec(codec).decode(data)
+        # Histories; sessions saved before they were split into segments
+        # keep them inline in the conversation row
+        for name, length, counts, codec in conn.execute(
+            "SELECT name, length, counts, codec FROM history_segments "
+            "WHERE session_id = ?",
+            (session_id,),
+        ):
+            if histories:
+                value = self.read_history(session_id, name)
+            else:
+                value = BoundedHistory.deferred(
+                    name.replace("_history", ""),
+                    length,
+                    partial(self.read_history, session_id, name),
+                    counts=get_codec(codec).decode(counts),
+                )
+            state_data.setdefault(HISTORY_SECTION, {})[name] = value
+
+        replayed = 0
+        for record, codec in conn.execute(
+            "SELECT record, codec FROM journal WHERE session_id = ? AND seq > ? "
+            "ORDER BY seq",
+            (session_id, meta[1]),
+        ):
+            record = get_codec(codec).decode(record)
+            apply_changes(state_data, record["changes"])
+            state_data["timestamp"] = record["timestamp"]
+            state_data["journal_seq"] = record["seq"]
+            replayed += 1
+        if not all(name in state_data for name in SUB_STATES):
+            return None
+        return state_data, replayed
+
+    def summary(self, session_id):
+        """The session's summary row as a dict, or None."""
+        conn = self._connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute(
+                "SELECT * FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        finally:
+            conn.row_factory = None
+        return dict(row) if row else None
+
+    def list_sessions(self, limit=None):
+        """Session IDs, most recently updated first."""
+        query = "SELECT session_id FROM sessions ORDER BY updated_at DESC"
+        params = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        return [row[0] for row in self._connection().execute(query, params)]
+
+    def delete_session(self, session_id):
+        with self._transaction() as conn:
+            for table in ("journal", "history_segments", "sub_states", "sessions"):
+                conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
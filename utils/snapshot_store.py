@@ -0,0 +1,279 @@
+"""
+Session history snapshots as deltas over content-addressed blobs.
+
+Each snapshot in the history directory is either a keyframe (the full
+state) or a delta: the changed fields since its parent snapshot, in the
+same form as the StateManager journal (histories carry only appended
+entries). Every KEYFRAME_INTERVAL snapshots a keyframe bounds the chain.
+
+String fields of at least BLOB_MIN_SIZE characters, such as the
+certificate text, are stored once under blobs/<sha256> and referenced as
+{"$blob": sha}, so an unchanged certificate costs nothing per snapshot.
+
+Snapshot files are named session_<timestamp with microseconds>_<n> and
+created exclusively, so two saves in the same second never collide.
+Files are gzip-compressed by default; zstd is used when requested and the
+zstandard package is installed. Plain session_*.json files from older
+versions are read as keyframes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+from utils.bounded_history import BoundedHistory
+from utils.codec import compress, decompress
+
+BLOB_MIN_SIZE = 1024
+KEYFRAME_INTERVAL = 20
+
+# Default snapshot compression: None, "gzip" or "zstd"
+COMPRESSION = "gzip"
+SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+COMPRESSION_OF_SUFFIX = {".gz": "gzip", ".zst": "zstd"}
+
+HISTORY_FIELDS = ("conversation_history", "reasoning_history")
+
+
+def apply_changes(state_data, changes):
+    """
+    Apply one journal record's (or delta snapshot's) changes to a
+    saved-state dict in place. History changes carry only the appended
+    entries; a deferred BoundedHistory takes them without being loaded.
+    """
+    for section, fields in changes.items():
+        section_data = state_data.setdefault(section, {})
+        for field, value in fields.items():
+            if field in HISTORY_FIELDS and "append" in value:
+                saved = section_data.get(field, [])
+                if isinstance(saved, list):
+                    saved.extend(value["append"])
+                elif isinstance(saved, BoundedHistory):
+                    saved.extend(value["append"], counts=value["counts"])
+                else:
+                    saved["window"].extend(value["append"])
+                    saved["counts"] = value["counts"]
+                section_data[field] = saved
+            else:
+                section_data[field] = value
+
+
+def merge_changes(merged, changes):
+    """Fold a later set of changes into merged, appends concatenated."""
+    for section, fields in changes.items():
+        merged_section = merged.setdefault(section, {})
+        for field, value in fields.items():
+            previous = merged_section.get(field)
+            if (
+                field in HISTORY_FIELDS
+                and "append" in value
+                and isinstance(previous, dict)
+            ):
+                if "append" in previous:
+                    previous = {
+                        "append": previous["append"] + value["append"],
+                        "counts": value["counts"],
+                    }
+                else:
+                    previous = dict(previous, window=list(previous["window"]))
+                    previous["window"].extend(value["append"])
+                    previous["counts"] = value["counts"]
+                merged_section[field] = previous
+            else:
+                merged_section[field] = value
+    return merged
+
+
+def _zstd_available():
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class SnapshotStore:
+    """Writes and reads delta snapshots and blobs under a history directory."""
+
+    def __init__(self, history_dir, compression=COMPRESSION):
+        if compression not in SUFFIXES:
+            raise ValueError(f"Unsupported snapshot compression: {compression}")
+        if compression == "zstd" and not _zstd_available():
+            print("⚠️ zstandard not installed; compressing snapshots with gzip")
+            compression = "gzip"
+        self.history_dir = Path(history_dir)
+        self.blob_dir = self.history_dir / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+
+        # Last snapshot written by this store and the delta chain behind it
+        self._parent = None
+        self._chain = 0
+        self._counter = 0
+
+    def reset_chain(self):
+        """Make the next snapshot a keyframe (e.g. after the session is cleared)."""
+        self._parent = None
+        self._chain = 0
+
+    def clear(self):
+        """Delete every snapshot and blob; the next snapshot is a keyframe."""
+        shutil.rmtree(self.history_dir, ignore_errors=True)
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.reset_chain()
+
+    def _write_file(self, path, payload, exclusive=True):
+        with open(path, "xb" if exclusive else "wb") as f:
+            f.write(compress(payload, self.compression))
+
+    def _read_file(self, path):
+        with open(path, "rb") as f:
+            return decompress(f.read(), COMPRESSION_OF_SUFFIX.get(path.suffix))
+
+    def put_blob(self, text):
+        """Store text once under its SHA-256; returns the digest."""
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        suffix = SUFFIXES[self.compression]
+        if not any(self.blob_dir.glob(f"{digest}.txt*")):
+            temp_path = self.blob_dir / f"{digest}.tmp"
+            self._write_file(temp_path, text.encode(), exclusive=False)
+            os.replace(temp_path, self.blob_dir / f"{digest}.txt{suffix}")
+        return digest
+
+    def get_blob(self, digest):
+        for path in self.blob_dir.glob(f"{digest}.txt*"):
+            return self._read_file(path).decode()
+        raise FileNotFoundError(f"Missing snapshot blob {digest}")
+
+    def _externalize(self, sections):
+        """Large string fields replaced by blob references."""
+        return {
+            section: {
+                field: (
+                    {"$blob": self.put_blob(value)}
+                    if isinstance(value, str) and len(value) >= BLOB_MIN_SIZE
+                    else value
+                )
+                for field, value in fields.items()
+            }
+            for section, fields in sections.items()
+        }
+
+    def _resolve(self, sections):
+        for fields in sections.values():
+            if not isinstance(fields, dict):
+                continue
+            for field, value in fields.items():
+                if isinstance(value, dict) and set(value) == {"$blob"}:
+                    fields[field] = self.get_blob(value["$blob"])
+        return sections
+
+    def _new_path(self):
+        """A snapshot path no other save can have taken."""
+        suffix = ".json" + SUFFIXES[self.compression]
+        while True:
+            self._counter += 1
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            path = self.history_dir / f"session_{stamp}_{self._counter}{suffix}"
+            if not path.exists():
+                return path
+
+    def write(self, state_data, changes=None):
+        """
+        Write a snapshot: a delta on the previous one when changes are
+        given and the chain is short enough, otherwise a keyframe.
+
+        Args:
+            state_data: Full saved-state dict (timestamp, journal_seq, sections)
+            changes: Field changes since this store's previous snapshot
+
+        Returns:
+            Name of the snapshot file
+        """
+        meta = {
+            "timestamp": state_data.get("timestamp"),
+            "journal_seq": state_data.get("journal_seq", 0),
+        }
+        if changes is not None and self._parent and self._chain < KEYFRAME_INTERVAL:
+            record = dict(meta, parent=self._parent, changes=self._externalize(changes))
+            self._chain += 1
+        else:
+            sections = {
+                key: value for key, value in state_data.items() if key not in meta
+            }
+            record = dict(meta, state=self._externalize(sections))
+            self._chain = 0
+
+        while True:
+            path = self._new_path()
+            try:
+                self._write_file(path, json.dumps(record).encode())
+                break
+            except FileExistsError:
+                continue
+        self._parent = path.name
+        return path.name
+
+    def _read_record(self, name):
+        return json.loads(self._read_file(self.history_dir / name))
+
+    def read(self, name):
+        """Full saved-state dict of a snapshot, following its delta chain."""
+        deltas = []
+        record = self._read_record(name)
+        while "parent" in record:
+            deltas.append(record)
+            record = self._read_record(record["parent"])
+        state_data = self._keyframe_state(record)
+        for delta in reversed(deltas):
+            self._apply(state_data, delta)
+        return state_data
+
+    def _keyframe_state(self, record):
+        if "state" not in record:
+            return record  # plain snapshot from an older version
+        state_data = {
+            "timestamp": record.get("timestamp"),
+            "journal_seq": record.get("journal_seq", 0),
+        }
+        state_data.update(self._resolve(record["state"]))
+        return state_data
+
+    def _apply(self, state_data, delta):
+        apply_changes(state_data, self._resolve(delta["changes"]))
+        state_data["timestamp"] = delta.get("timestamp")
+        state_data["journal_seq"] = delta.get("journal_seq", 0)
+
+    def names(self):
+        """Snapshot file names, oldest first."""
+        return sorted(
+            path.name
+            for path in self.history_dir.glob("session_*.json*")
+            if not path.name.endswith(".tmp")
+        )
+
+    def iter_snapshots(self):
+        """
+        Yield (name, state_data) for every snapshot, oldest first. A delta
+        whose parent was the previous snapshot is applied to a copy of it
+        instead of replaying its chain.
+        """
+        previous_name, previous = None, None
+        for name in self.names():
+            try:
+                record = self._read_record(name)
+                if record.get("parent") and record["parent"] == previous_name:
+                    state_data = json.loads(json.dumps(previous))
+                    self._apply(state_data, record)
+                elif "parent" in record:
+                    state_data = self.read(name)
+                else:
+                    state_data = self._keyframe_state(record)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Skipping {name}: {e}")
+                continue
+            previous_name, previous = name, state_data
+            yield name, state_data
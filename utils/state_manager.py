@@ -1,136 +1,401 @@
 import json
-import os
+import shutil
 from datetime import datetime
 from pathlib import Path
 
+from state.certificate_state import CertificateState
+from state.conversation_state import HISTORY_COUNT_KEYS, ConversationState
+from state.evaluation_state import EvaluationState
+from utils import metrics
+from utils.bounded_history import BoundedHistory
+from utils.codec import DEFAULT_CODEC, get_codec
+from utils.field_index import rebuild_field_index
+from utils.minhash import forget_extractions
+from utils.session_store import SessionStore
+from utils.snapshot_store import SnapshotStore, apply_changes
+from utils.state_writer import StateWriter
+from utils.text_index import text_fingerprint
+
+# Journal records written between compacted snapshots
+SNAPSHOT_INTERVAL = 50
+
+# Session used by the CLI; the web app gives each browser session its own
+DEFAULT_SESSION_ID = "default"
+
+# Sub-state models; their fields are what gets persisted, so a new model
+# field is saved and restored without touching this module
+STATE_MODELS = {
+    "certificate": CertificateState,
+    "evaluation": EvaluationState,
+    "conversation": ConversationState,
+}
+STATE_FIELDS = {
+    section: tuple(model.model_fields) for section, model in STATE_MODELS.items()
+}
+
+
+def session_dir(parent, session_id):
+    """A session's own directory under parent."""
+    # Hashed, so a session ID from a URL can't name an arbitrary path
+    return Path(parent) / text_fingerprint(session_id)
+
+
+def _is_history(section, field):
+    return STATE_MODELS[section].model_fields[field].annotation is BoundedHistory
+
+
+def _saved_value(value):
+    # Histories save their window plus spill metadata (utils.bounded_history)
+    return value.to_saved() if isinstance(value, BoundedHistory) else value
+
+
+def state_to_saved(state):
+    """Every persisted field of every sub-state, in its saved form."""
+    return {
+        section: {
+            field: _saved_value(getattr(state[section], field)) for field in fields
+        }
+        for section, fields in STATE_FIELDS.items()
+    }
+
+
+def restore_state(state, state_data):
+    """
+    Set the sub-states' fields from saved data. Fields missing from older
+    saves keep their defaults.
+    """
+    for section, fields in STATE_FIELDS.items():
+        saved = state_data.get(section, {})
+        for field in fields:
+            if field not in saved:
+                continue
+            value = saved[field]
+            if _is_history(section, field):
+                name = field.replace("_history", "")
+                value = BoundedHistory.from_saved(name, value, HISTORY_COUNT_KEYS[name])
+            setattr(state[section], field, value)
+    rebuild_field_index(state["certificate"])
+    return state
+
 
 class StateManager:
     """
     Manages state persistence for the Agentic Certificate Evaluator.
-    Saves and loads state to/from disk for production-ready memory.
+    Saves and loads one session's state to/from the session database
+    (utils.session_store) for production-ready memory.
     """
 
-    def __init__(self, state_dir="session_data"):
+    def __init__(
+        self,
+        state_dir="session_data",
+        session_id=DEFAULT_SESSION_ID,
+        background=True,
+        codec=DEFAULT_CODEC,
+    ):
         self.state_dir = Path(state_dir)
         self.state_dir.mkdir(exist_ok=True)
+        self.session_id = session_id
+        # Encoding of saved state (utils.codec), e.g. "orjson" or "msgpack+gzip"
+        self.codec = get_codec(codec)
+        self.store = SessionStore(self.state_dir / "sessions.db")
+        # Single-session files from older versions, imported on first load
         self.current_session_file = self.state_dir / "current_session.json"
-        self.history_dir = self.state_dir / "history"
-        self.history_dir.mkdir(exist_ok=True)
+        self.journal_file = self.state_dir / "journal.jsonl"
+        # Every compacted snapshot is kept as a delta (utils.snapshot_store),
+        # and history entries past the in-memory window are spilled
+        # (utils.bounded_history), in directories of this session's own
+        self.history_dir = session_dir(self.state_dir / "history", session_id)
+        self.snapshots = SnapshotStore(self.history_dir)
+        self.spill_dir = session_dir(self.state_dir / "history_spill", session_id)
+        # Disk writes happen on a background thread (utils.state_writer)
+        self.writer = StateWriter(
+            self.store, session_id, self.snapshots, self.codec, background=background
+        )
+
+        # What was last written per field (history lengths, string values or
+        # their JSON), so each save only journals what changed
+        self._saved = None
+        # Model versions (state.tracked_state) as of the last save, per
+        # sub-state and per field; unchanged ones aren't serialized at all
+        self._versions = {}
+        self._seq = 0
+        self._journal_records = 0
+
+    def _fingerprint(self, value):
+        if isinstance(value, BoundedHistory):
+            return len(value)
+        if isinstance(value, str):
+            return value
+        return json.dumps(value, sort_keys=True)
+
+    def _remember(self, state):
+        self._saved = {
+            (section, field): self._fingerprint(getattr(state[section], field))
+            for section, fields in STATE_FIELDS.items()
+            for field in fields
+        }
+        self._versions = self._model_versions(state)
+
+    def _model_versions(self, state, sections=STATE_FIELDS):
+        versions = {}
+        for section in sections:
+            model = state[section]
+            versions[section] = model.version
+            for field in STATE_FIELDS[section]:
+                versions[(section, field)] = model.field_version(field)
+        return versions
+
+    def _unchanged(self, state, section):
+        """True when nothing in a sub-state changed since the last save."""
+        model = state[section]
+        if model.version != self._versions.get(section):
+            return False
+        # Histories grow by appending, which doesn't bump the model version
+        return all(
+            len(getattr(model, field)) == self._saved[(section, field)]
+            for field in STATE_FIELDS[section]
+            if _is_history(section, field)
+        )
+
+    def _changes(self, state):
+        """
+        Changed fields since the last save, histories as appended entries.
+        Sub-states and fields whose version hasn't moved are skipped without
+        being serialized.
+
+        Returns:
+            (changes, fingerprints to remember once they're written,
+            sub-states that were compared)
+        """
+        changes, fingerprints, compared = {}, {}, []
+        for section, fields in STATE_FIELDS.items():
+            if self._unchanged(state, section):
+                metrics.increment("state.sub_states_skipped")
+                continue
+            compared.append(section)
+            model = state[section]
+            for field in fields:
+                value = getattr(model, field)
+                if not isinstance(value, BoundedHistory) and model.field_version(
+                    field
+                ) == self._versions.get((section, field)):
+                    continue
+                fingerprint = self._fingerprint(value)
+                previous = self._saved.get((section, field))
+                fingerprints[(section, field)] = fingerprint
+                if fingerprint == previous:
+                    continue
+                if isinstance(value, BoundedHistory):
+                    if isinstance(previous, int) and previous < fingerprint:
+                        value = {
+                            "append": value[previous:],
+                            "counts": value.counts(),
+                        }
+                    else:
+                        value = value.to_saved()
+                changes.setdefault(section, {})[field] = value
+        return changes, fingerprints, compared
+
+    def _bind_histories(self, state):
+        """Spill the conversation's histories into this session's directory."""
+        for field in STATE_FIELDS["conversation"]:
+            if _is_history("conversation", field):
+                getattr(state["conversation"], field).spill_dir = self.spill_dir
+
+    def _write_snapshot(self, state):
+        """Queue the full state as a snapshot; the journal starts over."""
+        state_data = {
+            "timestamp": datetime.now().isoformat(),
+            "journal_seq": self._seq,
+        }
+        state_data.update(state_to_saved(state))
+        payload = self.codec.encode(state_data)
+        self.writer.submit_snapshot(payload)
+        self._journal_records = 0
+        self._remember(state)
+        return len(payload)
 
     def save_state(self, state):
         """
         Save the current state to disk.
 
+        Each call appends the fields that changed since the last save to the
+        journal; every SNAPSHOT_INTERVAL records the full state is written
+        as a snapshot and the journal starts over. Sub-states whose version
+        hasn't changed (state.tracked_state) are skipped. Only serializing
+        the changes happens here; the writes are done by the background
+        writer. Bytes queued per save are recorded as "state.save_bytes".
+
         Args:
             state: GlobalState dict with certificate, conversation, evaluation
         """
         try:
-            # Convert state to JSON-serializable format
-            state_data = {
-                "timestamp": datetime.now().isoformat(),
-                "certificate": {
-                    "raw_text": state["certificate"].raw_text,
-                    "extracted_fields": state["certificate"].extracted_fields,
-                    "confidence": state["certificate"].confidence,
-                },
-                "evaluation": {
-                    "criteria": state["evaluation"].criteria,
-                    "scores": state["evaluation"].scores,
-                    "final_score": state["evaluation"].final_score,
-                },
-                "conversation": {
-                    "last_user_message": state["conversation"].last_user_message,
-                    "last_agent_message": state["conversation"].last_agent_message,
-                    "last_reason": state["conversation"].last_reason,
-                    "uncertainty": state["conversation"].uncertainty,
-                    "last_user_intent": state["conversation"].last_user_intent,
-                    "pending_confirmation": state["conversation"].pending_confirmation,
-                    "conversation_history": state["conversation"].conversation_history,
-                    "reasoning_history": state["conversation"].reasoning_history,
-                },
-            }
-
-            # Save to current session file
-            with open(self.current_session_file, "w") as f:
-                json.dump(state_data, f, indent=2)
-
-            # Also save to history with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            history_file = self.history_dir / f"session_{timestamp}.json"
-            with open(history_file, "w") as f:
-                json.dump(state_data, f, indent=2)
+            self._bind_histories(state)
+            if self._saved is None:
+                metrics.observe("state.save_bytes", self._write_snapshot(state))
+                return True
+
+            changes, fingerprints, compared = self._changes(state)
+            written = 0
+            if changes:
+                self._seq += 1
+                record = {
+                    "seq": self._seq,
+                    "timestamp": datetime.now().isoformat(),
+                    "changes": changes,
+                }
+                payload = self.codec.encode(record)
+                self.writer.submit_journal(payload)
+                self._journal_records += 1
+                written += len(payload)
+            self._saved.update(fingerprints)
+            self._versions.update(self._model_versions(state, compared))
 
+            if self._journal_records >= SNAPSHOT_INTERVAL:
+                written += self._write_snapshot(state)
+            metrics.observe("state.save_bytes", written)
             return True
 
         except Exception as e:
             print(f"⚠️ Failed to save state: {e}")
             return False
 
+    def _read_session(self):
+        """
+        The session's last snapshot with its journal replayed, or None.
+        Histories are left deferred (see SessionStore.read_session).
+
+        Returns:
+            (state_data, number of journal records replayed)
+        """
+        self.writer.flush()
+        return self.store.read_session(self.session_id, histories=False)
+
+    def _read_legacy_session(self):
+        """
+        State saved by older versions in current_session.json and
+        journal.jsonl, or None.
+
+        Returns:
+            (state_data, number of journal records replayed)
+        """
+        if not self.current_session_file.exists():
+            return None
+        with open(self.current_session_file, "r") as f:
+            state_data = json.load(f)
+
+        replayed = 0
+        snapshot_seq = state_data.get("journal_seq", 0)
+        state_data["journal_seq"] = snapshot_seq
+        if self.journal_file.exists():
+            with open(self.journal_file, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final line from an interrupted write
+                        print("⚠️ Ignoring incomplete journal record")
+                        break
+                    if record["seq"] <= snapshot_seq:
+                        continue
+                    apply_changes(state_data, record["changes"])
+                    state_data["timestamp"] = record["timestamp"]
+                    state_data["journal_seq"] = record["seq"]
+                    replayed += 1
+        return state_data, replayed
+
     def load_state(self, state):
         """
-        Load the last saved state from disk if it exists.
+        Load the last saved state from disk if it exists, replaying the
+        journal on top of the last snapshot. History entries are only read
+        when something first needs them; their lengths are known up front.
 
         Args:
             state: Empty GlobalState dict to populate
 
         Returns:
             Populated state dict or original empty state
+
+        Raises:
+            RuntimeError: The session was saved with a codec (utils.codec)
+                that isn't installed here
         """
+        state["conversation"].session_id = self.session_id
+        self._bind_histories(state)
         try:
-            if not self.current_session_file.exists():
+            session = self._read_session()
+            legacy = session is None and self.session_id == DEFAULT_SESSION_ID
+            if legacy:
+                session = self._read_legacy_session()
+            if session is None:
                 return state  # No saved state, return empty
+            state_data, replayed = session
+
+            restore_state(state, state_data)
+            state["conversation"].session_id = self.session_id
+            self._bind_histories(state)
 
-            with open(self.current_session_file, "r") as f:
-                state_data = json.load(f)
-
-            # Restore certificate state
-            state["certificate"].raw_text = state_data["certificate"]["raw_text"]
-            state["certificate"].extracted_fields = state_data["certificate"][
-                "extracted_fields"
-            ]
-            state["certificate"].confidence = state_data["certificate"]["confidence"]
-
-            # Restore evaluation state
-            state["evaluation"].criteria = state_data["evaluation"]["criteria"]
-            state["evaluation"].scores = state_data["evaluation"]["scores"]
-            state["evaluation"].final_score = state_data["evaluation"]["final_score"]
-
-            # Restore conversation state
-            conv = state_data["conversation"]
-            state["conversation"].last_user_message = conv["last_user_message"]
-            state["conversation"].last_agent_message = conv["last_agent_message"]
-            state["conversation"].last_reason = conv["last_reason"]
-            state["conversation"].uncertainty = conv["uncertainty"]
-            state["conversation"].last_user_intent = conv["last_user_intent"]
-            state["conversation"].pending_confirmation = conv["pending_confirmation"]
-            state["conversation"].conversation_history = conv["conversation_history"]
-            state["conversation"].reasoning_history = conv["reasoning_history"]
+            self._seq = state_data["journal_seq"]
+            self._journal_records = replayed
+            self._remember(state)
+            if legacy:
+                # Nothing of this session is in the database yet
+                self._saved = None
 
             print(
-                f"✓ Loaded previous session ({len(conv['conversation_history'])} exchanges)"
+                f"✓ Loaded previous session "
+                f"({len(state['conversation'].conversation_history)} exchanges)"
             )
             return state
 
+        except ImportError as e:
+            # Saved with a codec that isn't installed here; starting empty
+            # would overwrite the session on the next save
+            raise RuntimeError(
+                f"Session {self.session_id} was saved with a codec that isn't "
+                f"installed ({e}); install it to load the session"
+            ) from e
         except Exception as e:
             print(f"⚠️ Failed to load state: {e}")
             return state  # Return empty state on error
 
     def clear_session(self):
-        """Clear the current session file."""
+        """
+        Clear the current session's snapshots (current and kept), journal,
+        history segments and cached extractions.
+        """
         try:
-            if self.current_session_file.exists():
-                self.current_session_file.unlink()
+            self.writer.reset()
+            self.store.delete_session(self.session_id)
+            self.snapshots.clear()
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            forget_extractions(self.session_id)
+            if self.session_id == DEFAULT_SESSION_ID:
+                for path in (self.current_session_file, self.journal_file):
+                    if path.exists():
+                        path.unlink()
+            self._saved = None
+            self._journal_records = 0
             print("✓ Session cleared")
             return True
         except Exception as e:
             print(f"⚠️ Failed to clear session: {e}")
             return False
 
-    def list_sessions(self):
-        """List all saved session files."""
+    def flush(self):
+        """Wait until every queued save is on disk (e.g. before exiting)."""
+        self.writer.flush()
+
+    def iter_snapshots(self):
+        """Yield (name, state_data) for every kept snapshot, oldest first."""
+        self.writer.flush()
+        yield from self.snapshots.iter_snapshots()
+
+    def list_sessions(self, limit=None):
+        """List saved session IDs, most recently updated first."""
         try:
-            sessions = sorted(self.history_dir.glob("session_*.json"), reverse=True)
-            return [s.name for s in sessions]
+            self.writer.flush()
+            return self.store.list_sessions(limit)
         except Exception as e:
             print(f"⚠️ Failed to list sessions: {e}")
             return []
@@ -138,22 +403,17 @@ class StateManager:
     def get_session_summary(self):
         """Get a summary of the current session."""
         try:
-            if not self.current_session_file.exists():
+            self.writer.flush()
+            summary = self.store.summary(self.session_id)
+            if summary is None:
                 return "No active session"
 
-            with open(self.current_session_file, "r") as f:
-                state_data = json.load(f)
-
-            timestamp = state_data.get("timestamp", "Unknown")
-            conv_count = len(state_data["conversation"]["conversation_history"])
-            extracted_count = len(state_data["certificate"]["extracted_fields"])
-            criteria_count = len(state_data["evaluation"]["criteria"])
-
             return (
-                f"Session from {timestamp}\n"
-                f"  - Conversations: {conv_count}\n"
-                f"  - Extracted fields: {extracted_count}\n"
-                f"  - Active criteria: {criteria_count}"
+                f"Session {self.session_id} from {summary['updated_at']}\n"
+                f"  - Conversations: {summary['exchanges']}\n"
+                f"  - Extracted fields: {summary['extracted_fields']}\n"
+                f"  - Active criteria: {summary['criteria']}\n"
+                f"  - Final score: {summary['final_score']:.1f}/100"
             )
 
         except Exception as e:
@@ -0,0 +1,182 @@
+import atexit
+import queue
+import threading
+
+from utils import metrics
+from utils.session_store import HISTORY_SECTION, SUB_STATES
+from utils.snapshot_store import HISTORY_FIELDS, merge_changes
+
+# Saves waiting for the writer thread, across every session in the
+# process; a full queue makes save_state wait
+WRITE_QUEUE_SIZE = 64
+
+
+class _WriterThread:
+    """The one background thread that writes every StateWriter's jobs."""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self.thread = threading.Thread(
+            target=self._run, name="state-writer", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            jobs = [self.queue.get()]
+            # Coalesce whatever else is already waiting, per session
+            while True:
+                try:
+                    jobs.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            batches = {}
+            for writer, job in jobs:
+                batches.setdefault(writer, []).append(job)
+            for writer, batch in batches.items():
+                try:
+                    writer._write_batch(batch)
+                except Exception as e:
+                    print(f"⚠️ Background save failed: {e}")
+                finally:
+                    writer._written(len(batch))
+            count = len(jobs)
+            # Drop the references so finished sessions' writers can be freed
+            jobs = batches = writer = batch = None
+            for _ in range(count):
+                self.queue.task_done()
+
+
+_writer_thread = None
+_writer_thread_lock = threading.Lock()
+
+
+def _shared_thread():
+    global _writer_thread
+    with _writer_thread_lock:
+        if _writer_thread is None:
+            _writer_thread = _WriterThread()
+            atexit.register(_flush_all)
+        return _writer_thread
+
+
+def _flush_all():
+    """Wait for every queued save in the process (e.g. at exit)."""
+    if _writer_thread is not None:
+        _writer_thread.queue.join()
+
+
+class StateWriter:
+    """
+    Writes StateManager's journal records and snapshots off the request path.
+
+    Jobs arrive already encoded with the codec, so the state can keep changing while
+    they're written. One writer thread per process drains a bounded queue
+    shared by every session, in per-session batches: journal records queued together are committed to the session
+    store in one transaction, and records followed by a snapshot in the
+    same batch are skipped since the snapshot contains them. Snapshots
+    upsert only the sub-states and histories changed since the previous one.
+
+    With background=False every job is written before submit returns.
+    """
+
+    def __init__(self, store, session_id, snapshots, codec, background=True):
+        self.store = store
+        self.session_id = session_id
+        self.snapshots = snapshots
+        self.codec = codec
+
+        # Changes since the last snapshot: the history snapshot's delta and
+        # which sub-states need upserting
+        self.pending_changes = {}
+        # The first snapshot writes every sub-state
+        self._snapshotted = False
+
+        # Jobs are written by the process-wide writer thread; this counts
+        # the ones of this writer still queued, for flush()
+        self._thread = _shared_thread() if background else None
+        self._queued = 0
+        self._idle = threading.Condition()
+
+    def submit_journal(self, payload):
+        self._submit(("journal", payload))
+
+    def submit_snapshot(self, payload):
+        self._submit(("snapshot", payload))
+
+    def _submit(self, job):
+        if self._thread is None:
+            self._write_batch([job])
+            return
+        with self._idle:
+            self._queued += 1
+        self._thread.queue.put((self, job))
+
+    def _written(self, count):
+        with self._idle:
+            self._queued -= count
+            if not self._queued:
+                self._idle.notify_all()
+
+    def flush(self):
+        """Block until everything this writer submitted so far is on disk."""
+        with self._idle:
+            self._idle.wait_for(lambda: not self._queued)
+
+    def close(self):
+        """Flush; the writer thread is shared and keeps running."""
+        self.flush()
+
+    def reset(self):
+        """Forget pending history changes; the next snapshot is a keyframe."""
+        self.flush()
+        self.pending_changes = {}
+        self._snapshotted = False
+        self.snapshots.reset_chain()
+
+    def _write_batch(self, jobs):
+        if not jobs:
+            return
+        records = []
+        for kind, payload in jobs:
+            if kind == "journal":
+                record = self.codec.decode(payload)
+                merge_changes(self.pending_changes, record["changes"])
+                records.append((record, payload))
+            elif kind == "snapshot":
+                self._write_snapshot(self.codec.decode(payload))
+                records = []
+
+        if records:
+            written = self.store.append_journal(self.session_id, records, self.codec)
+            metrics.increment("state_writer.journal_records", len(records))
+            metrics.increment("state_writer.bytes_written", written)
+        metrics.increment("state_writer.batches")
+
+    def _write_snapshot(self, state_data):
+        # Unchanged sub-states and histories keep their rows; the journal
+        # rows go
+        sub_states, histories = SUB_STATES, HISTORY_FIELDS
+        if self._snapshotted:
+            changed = self.pending_changes
+            sub_states = [
+                name
+                for name in SUB_STATES
+                if set(changed.get(name, {})) - set(HISTORY_FIELDS)
+            ]
+            histories = [
+                name
+                for name in HISTORY_FIELDS
+                if name in changed.get(HISTORY_SECTION, {})
+            ]
+        written = self.store.write_snapshot(
+            self.session_id, state_data, sub_states, self.codec, histories
+        )
+        metrics.increment("state_writer.bytes_written", written)
+        metrics.increment("state.sub_states_skipped", len(SUB_STATES) - len(sub_states))
+        self._snapshotted = True
+
+        # Keep every snapshot in history, as a delta on the previous one
+        self.snapshots.write(state_data, self.pending_changes)
+        self.pending_changes = {}
+        metrics.increment("state_writer.snapshots")
@@ -0,0 +1,387 @@
+import bisect
+import hashlib
+import json
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+
+# Compact the update log into the snapshot once it holds this many operations
+COMPACT_AFTER = 200
+
+
+def tokenize(text):
+    """Lowercase word tokens; apostrophes stay inside words (dean's)."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def text_fingerprint(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class TextIndex:
+    """
+    Tokenized inverted index over certificate text.
+
+    Postings map term -> doc_id -> [(line, position), ...] where position is
+    the token offset within the document, which makes phrase queries a
+    positional join. A sorted term list backs prefix queries.
+
+    When created with a directory the index persists itself as a snapshot
+    plus an append-only update log, so adding or removing one document only
+    appends that document's postings instead of rewriting everything.
+    Several processes can share the directory: writes and compaction hold
+    a file lock, and refresh() picks up what other processes wrote.
+    """
+
+    def __init__(self, index_dir=None):
+        self.postings = defaultdict(dict)
+        self.docs = {}
+        self._sorted_terms = None
+        self.index_dir = Path(index_dir) if index_dir else None
+        self._pending_ops = 0
+        # How much of the on-disk index this instance has applied: the
+        # snapshot it loaded and the bytes of the update log after it
+        self._snapshot_stamp = None
+        self._log_stamp = None
+        self._log_offset = 0
+
+        if self.index_dir:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with self._locked():
+                self._load()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _document_postings(self, text):
+        lines = text.splitlines()
+        doc_postings = defaultdict(list)
+        position = 0
+        for line_no, line in enumerate(lines):
+            for token in tokenize(line):
+                doc_postings[token].append((line_no, position))
+                position += 1
+        return lines, doc_postings
+
+    def _apply_add(self, doc_id, fingerprint, lines, doc_postings):
+        self._apply_remove(doc_id)
+        self.docs[doc_id] = {"fingerprint": fingerprint, "lines": lines}
+        for term, hits in doc_postings.items():
+            self.postings[term][doc_id] = [tuple(hit) for hit in hits]
+        self._sorted_terms = None
+
+    def _apply_remove(self, doc_id):
+        if doc_id not in self.docs:
+            return
+        lines = self.docs.pop(doc_id)["lines"]
+        for term in set(tokenize("\n".join(lines))):
+            self.postings[term].pop(doc_id, None)
+            if not self.postings[term]:
+                del self.postings[term]
+        self._sorted_terms = None
+
+    def add_document(self, doc_id, text):
+        """
+        Index (or re-index) one document.
+
+        Returns:
+            False if the document was already indexed with identical text
+        """
+        fingerprint = text_fingerprint(text)
+        if self.docs.get(doc_id, {}).get("fingerprint") == fingerprint:
+            return False
+
+        lines, doc_postings = self._document_postings(text)
+        self._commit(
+            {
+                "op": "add",
+                "doc": doc_id,
+                "fingerprint": fingerprint,
+                "lines": lines,
+                "postings": doc_postings,
+            }
+        )
+        return True
+
+    def remove_document(self, doc_id):
+        if doc_id in self.docs:
+            self._commit({"op": "remove", "doc": doc_id})
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _terms_with_prefix(self, prefix):
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        start = bisect.bisect_left(self._sorted_terms, prefix)
+        terms = []
+        for term in self._sorted_terms[start:]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _term_hits(self, term, prefix=False):
+        """doc_id -> {position: line} for a term (or all terms with that prefix)."""
+        terms = self._terms_with_prefix(term) if prefix else [term]
+        hits = defaultdict(dict)
+        for t in terms:
+            for doc_id, positions in self.postings.get(t, {}).items():
+                for line, position in positions:
+                    hits[doc_id][position] = line
+        return hits
+
+    def phrase(self, query, prefix=False):
+        """
+        Find a phrase (consecutive tokens) across all documents.
+
+        Args:
+            query: Phrase text; a single word is a plain term query
+            prefix: Treat the last token as a prefix ("lab" matches "laboratory")
+
+        Returns:
+            Dict of doc_id -> sorted list of line numbers where the phrase starts
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return {}
+
+        last = len(tokens) - 1
+        matches = self._term_hits(tokens[0], prefix and last == 0)
+        for offset, token in enumerate(tokens[1:], 1):
+            following = self._term_hits(token, prefix and offset == last)
+            narrowed = {}
+            for doc_id, starts in matches.items():
+                positions = following.get(doc_id)
+                if not positions:
+                    continue
+                kept = {
+                    p: line for p, line in starts.items() if p + offset in positions
+                }
+                if kept:
+                    narrowed[doc_id] = kept
+            matches = narrowed
+            if not matches:
+                break
+
+        return {
+            doc_id: sorted(set(starts.values())) for doc_id, starts in matches.items()
+        }
+
+    def contains(self, doc_id, query, prefix=True):
+        """True if the document contains the phrase (last token as prefix)."""
+        return doc_id in self.phrase(query, prefix=prefix)
+
+    def search(self, query):
+        """
+        Corpus search with a small query language.
+
+        Quoted "exact phrases" and bare words are AND-ed together; a trailing
+        * makes a word a prefix query (comput*).
+
+        Returns:
+            List of (doc_id, line_number, line_text) tuples
+        """
+        clauses = [(phrase, False) for phrase in re.findall(r'"([^"]+)"', query)]
+        for word in re.sub(r'"[^"]*"', " ", query).split():
+            if word.endswith("*"):
+                clauses.append((word[:-1], True))
+            else:
+                clauses.append((word, False))
+        clauses = [(text, prefix) for text, prefix in clauses if tokenize(text)]
+        if not clauses:
+            return []
+
+        results = None
+        for text, prefix in clauses:
+            hits = self.phrase(text, prefix=prefix)
+            if results is None:
+                results = {doc: set(lines) for doc, lines in hits.items()}
+            else:
+                results = {
+                    doc: lines | set(hits[doc])
+                    for doc, lines in results.items()
+                    if doc in hits
+                }
+
+        return [
+            (doc_id, line, self.docs[doc_id]["lines"][line])
+            for doc_id in sorted(results)
+            for line in sorted(results[doc_id])
+        ]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @property
+    def _snapshot_file(self):
+        return self.index_dir / "snapshot.json"
+
+    @property
+    def _log_file(self):
+        return self.index_dir / "updates.jsonl"
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    @contextmanager
+    def _locked(self):
+        """Hold the index directory's lock (no-op without fcntl)."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.index_dir / ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _commit(self, op):
+        """Apply an operation and append it to the update log."""
+        if not self.index_dir:
+            self._replay(op)
+            return
+        with self._locked():
+            # Other processes' updates first, so memory matches the log order
+            self._refresh()
+            self._replay(op)
+            with open(self._log_file, "ab") as f:
+                f.write(json.dumps(op).encode() + b"\n")
+            self._log_stamp = self._stamp(self._log_file)[0]
+            self._log_offset = self._log_file.stat().st_size
+            self._pending_ops += 1
+            if self._pending_ops >= COMPACT_AFTER:
+                self._compact()
+
+    def _replay(self, op):
+        if op["op"] == "add":
+            self._apply_add(op["doc"], op["fingerprint"], op["lines"], op["postings"])
+        elif op["op"] == "remove":
+            self._apply_remove(op["doc"])
+
+    def _reset(self):
+        self.postings = defaultdict(dict)
+        self.docs = {}
+        self._sorted_terms = None
+        self._pending_ops = 0
+        self._snapshot_stamp = None
+        self._log_stamp = None
+        self._log_offset = 0
+
+    def _load(self):
+        try:
+            self._snapshot_stamp = self._stamp(self._snapshot_file)
+            if self._snapshot_stamp is not None:
+                with open(self._snapshot_file, "r") as f:
+                    snapshot = json.load(f)
+                self.docs = snapshot["docs"]
+                for term, docs in snapshot["postings"].items():
+                    self.postings[term] = {
+                        doc_id: [tuple(hit) for hit in hits]
+                        for doc_id, hits in docs.items()
+                    }
+            self._read_log()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Failed to load text index, rebuilding: {e}")
+            self._reset()
+
+    def _read_log(self):
+        """Apply update log lines written since this instance last read it."""
+        log_stamp = self._stamp(self._log_file)
+        if log_stamp is None:
+            return
+        self._log_stamp = log_stamp[0]
+        with open(self._log_file, "rb") as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # another process is mid-write
+                self._log_offset += len(line)
+                if line.strip():
+                    self._replay(json.loads(line))
+                    self._pending_ops += 1
+
+    def _refresh(self):
+        """Catch up with other processes' updates; reload if they compacted."""
+        try:
+            log = self._log_file.stat()
+        except OSError:
+            log = None
+        if log is None:
+            compacted = self._log_offset > 0
+        else:
+            compacted = log.st_size < self._log_offset or (
+                self._log_stamp is not None and log.st_ino != self._log_stamp
+            )
+        if compacted or self._stamp(self._snapshot_file) != self._snapshot_stamp:
+            self._reset()
+            self._load()
+            return
+        try:
+            self._read_log()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Failed to read text index updates, reloading: {e}")
+            self._reset()
+            self._load()
+
+    def refresh(self):
+        """Pick up documents other processes added or removed."""
+        if not self.index_dir:
+            return
+        with self._locked():
+            self._refresh()
+
+    def compact(self):
+        """Fold the update log into a fresh snapshot."""
+        if not self.index_dir:
+            return
+        with self._locked():
+            self._refresh()
+            self._compact()
+
+    def _compact(self):
+        # Caller holds the lock and has caught up with the log
+        tmp_file = self._snapshot_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({"docs": self.docs, "postings": self.postings}, f)
+        tmp_file.replace(self._snapshot_file)
+        if self._log_file.exists():
+            self._log_file.unlink()
+        self._snapshot_stamp = self._stamp(self._snapshot_file)
+        self._log_stamp = None
+        self._log_offset = 0
+        self._pending_ops = 0
+
+
+@lru_cache(maxsize=32)
+def _lowered(raw_text):
+    return raw_text.lower()
+
+
+def text_contains(raw_text, phrase):
+    """
+    `phrase.lower() in raw_text.lower()`, with the lowercased text cached
+    per certificate. Plain substring semantics ("ship" is found inside
+    "scholarship"), as the raw-text fallbacks have always used.
+    """
+    if not raw_text:
+        return False
+    return phrase.lower() in _lowered(raw_text)
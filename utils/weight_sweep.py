@@ -0,0 +1,181 @@
+"""
+What-if analysis over criterion weights.
+
+Everything here works on unweighted criterion scores (as returned by
+ScoringEngine.raw_scores), so trying another weighting is plain arithmetic:
+no field matching and no LLM call. Final scores use the same normalisation
+as rescore_certificate (weighted sum divided by the total weight).
+"""
+
+from itertools import combinations
+
+import numpy as np
+
+# Upper bound on grid sizes; larger requests should use dirichlet_weights
+MAX_GRID_POINTS = 100_000
+
+
+def normalize_weights(weights):
+    """Rows (or a single vector) of weights rescaled to sum to 1."""
+    weights = np.asarray(weights, dtype=np.float64)
+    totals = weights.sum(axis=-1, keepdims=True)
+    return np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+
+
+def weight_grid(n_criteria, step=0.1):
+    """
+    Every weight vector on the simplex whose weights are multiples of step.
+
+    Returns:
+        numpy array of shape (points, n_criteria), each row summing to 1
+    """
+    units = int(round(1 / step))
+    if n_criteria < 1 or units < 1:
+        return np.zeros((0, max(n_criteria, 0)))
+
+    # Stars and bars: choose n-1 divider positions among units + n - 1 slots
+    slots = units + n_criteria - 1
+    points = []
+    for dividers in combinations(range(slots), n_criteria - 1):
+        bounds = (-1,) + dividers + (slots,)
+        points.append([bounds[i + 1] - bounds[i] - 1 for i in range(n_criteria)])
+        if len(points) > MAX_GRID_POINTS:
+            raise ValueError(
+                f"Weight grid exceeds {MAX_GRID_POINTS} points; "
+                "use a coarser step or dirichlet_weights"
+            )
+    return np.asarray(points, dtype=np.float64) / units
+
+
+def dirichlet_weights(n_criteria, samples=1000, concentration=1.0, center=None, seed=0):
+    """
+    Random weight vectors drawn from a Dirichlet distribution.
+
+    Without a center the samples cover the whole simplex uniformly
+    (concentration 1). With a center (e.g. the current weights) they cluster
+    around it, tighter as concentration grows.
+    """
+    rng = np.random.default_rng(seed)
+    if center is None:
+        alpha = np.full(n_criteria, float(concentration))
+    else:
+        alpha = np.maximum(normalize_weights(center) * concentration, 1e-3)
+    return rng.dirichlet(alpha, size=samples)
+
+
+def final_scores(raw_scores, weights):
+    """
+    Final scores for every certificate under every weight vector at once.
+
+    Args:
+        raw_scores: (certificates, criteria) or (criteria,) unweighted scores
+        weights: (vectors, criteria) or (criteria,) weights, any scale
+
+    Returns:
+        (certificates, vectors) array, squeezed like the inputs
+    """
+    raw = np.atleast_2d(np.asarray(raw_scores, dtype=np.float64))
+    result = raw @ normalize_weights(np.atleast_2d(weights)).T
+    if np.ndim(weights) == 1:
+        result = result[:, 0]
+    if np.ndim(raw_scores) == 1:
+        result = result[0]
+    return result
+
+
+def _ranks(finals):
+    """
+    Rank of each certificate (row) under each weight vector (column):
+    1 + the number of certificates scoring strictly higher.
+
+    Each column is sorted once and searched, so memory stays O(n * v)
+    instead of comparing every pair of certificates.
+    """
+    n = finals.shape[0]
+    ordered = np.sort(finals, axis=0)
+    ranks = np.empty(finals.shape, dtype=np.int64)
+    for j in range(finals.shape[1]):
+        ranks[:, j] = 1 + n - np.searchsorted(ordered[:, j], finals[:, j], "right")
+    return ranks
+
+
+def rank_stability(raw_scores, weights, base_weights):
+    """
+    How stable each certificate's rank is across weight vectors.
+
+    Returns:
+        Dict of numpy arrays over certificates: base_rank, best_rank,
+        worst_rank and stability (share of weight vectors that keep the
+        base rank). Rank 1 is best; ties share the better rank.
+    """
+    raw = np.atleast_2d(np.asarray(raw_scores, dtype=np.float64))
+    finals = final_scores(raw, weights)
+    base = final_scores(raw, base_weights).reshape(-1)
+
+    ranks = _ranks(finals.reshape(raw.shape[0], -1))
+    base_rank = _ranks(base[:, None])[:, 0]
+    return {
+        "base_rank": base_rank,
+        "best_rank": ranks.min(axis=1),
+        "worst_rank": ranks.max(axis=1),
+        "stability": (ranks == base_rank[:, None]).mean(axis=1),
+    }
+
+
+def break_even_weights(raw_scores, base_weights, target):
+    """
+    Weight each criterion would need for the final score to hit target.
+
+    Criterion j's weight is moved to w while the other weights keep their
+    proportions and share 1 - w, so the final score is
+    w * s_j + (1 - w) * r_j, where r_j is the base-weighted mean of the
+    other criteria. Solving for target gives w = (target - r_j) / (s_j - r_j).
+
+    Pass a score difference between two certificates and target 0 to get
+    the weights at which their ranks swap.
+
+    Returns:
+        (criteria,) array of break-even weights; NaN where no weight in
+        [0, 1] reaches the target
+    """
+    raw = np.asarray(raw_scores, dtype=np.float64)
+    weights = normalize_weights(base_weights)
+
+    rest_weight = 1 - weights
+    rest_sum = raw @ weights - raw * weights
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rest_mean = np.where(rest_weight > 0, rest_sum / rest_weight, raw)
+        result = (target - rest_mean) / (raw - rest_mean)
+    reachable = np.isfinite(result) & (result >= 0) & (result <= 1)
+    return np.where(reachable, result, np.nan)
+
+
+def reweight(weights, changes):
+    """
+    Apply explicit weights to some criteria and rescale the rest.
+
+    The changed criteria take exactly the given (normalised) weights and the
+    unchanged ones share the remainder in their current proportions.
+
+    Args:
+        weights: Dict of criterion name to current weight
+        changes: Dict of criterion name to new weight in [0, 1]
+
+    Returns:
+        New dict of weights summing to 1
+    """
+    current = dict(zip(weights, normalize_weights(list(weights.values()))))
+    fixed = {name: float(value) for name, value in changes.items() if name in current}
+    remaining = max(0.0, 1.0 - sum(fixed.values()))
+    others = {name: w for name, w in current.items() if name not in fixed}
+    others_total = sum(others.values())
+
+    result = {}
+    for name in weights:
+        if name in fixed:
+            result[name] = fixed[name]
+        elif others_total > 0:
+            result[name] = others[name] / others_total * remaining
+        else:
+            result[name] = remaining / len(others)
+    return result